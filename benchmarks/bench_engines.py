@@ -0,0 +1,136 @@
+"""Compare transcription engines on speed and accuracy.
+
+Every clip in the reference folder (any audio file with a ``.txt``
+transcript of the same name next to it) is transcribed by each engine.
+The benchmark reports the real-time factor (transcription seconds per
+audio second, lower is faster) and the word error rate against the
+references. Each engine runs in a fresh subprocess so that model loading
+is measured in isolation. Decoding is done up front and not timed.
+
+Usage:
+    python benchmarks/bench_engines.py clips/ --model small \
+        --engines whisper faster-whisper --threads 8 --beam-size 1
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+_WORD = re.compile(r"[\w']+")
+
+
+def normalize(text: str) -> list[str]:
+    """Lower-case words without punctuation, as compared by the WER."""
+    return _WORD.findall(text.lower())
+
+
+def word_errors(reference: list[str], hypothesis: list[str]) -> int:
+    """Substitutions, deletions and insertions turning one into the other."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, start=1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_word != hyp_word),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def find_clips(folder: Path) -> list[tuple[Path, str]]:
+    from classes.discovery import AUDIO_EXTENSIONS
+
+    clips = []
+    for audio in sorted(folder.iterdir()):
+        reference = audio.with_suffix(".txt")
+        if audio.suffix.lower() in AUDIO_EXTENSIONS and reference.exists():
+            clips.append((audio, reference.read_text(encoding="utf-8")))
+    return clips
+
+
+def run_engine(args) -> dict:
+    """Transcribe every clip with one engine in this process."""
+    from classes.audio import SAMPLE_RATE, decode_audio
+    from classes.transcription import create_engine
+
+    clips = [(decode_audio(path), text) for path, text in find_clips(args.clips)]
+    engine = create_engine(args.engine, args.model, args.threads, args.beam_size)
+    start = time.perf_counter()
+    engine.load()
+    load_seconds = time.perf_counter() - start
+
+    audio_seconds = transcribe_seconds = 0.0
+    errors = words = 0
+    for audio, reference in clips:
+        start = time.perf_counter()
+        text = engine.transcribe(audio)["text"]
+        transcribe_seconds += time.perf_counter() - start
+        audio_seconds += len(audio) / SAMPLE_RATE
+        expected = normalize(reference)
+        errors += word_errors(expected, normalize(text))
+        words += len(expected)
+    return {
+        "engine": args.engine,
+        "model": args.model,
+        "clips": len(clips),
+        "audio_seconds": round(audio_seconds, 1),
+        "load_seconds": round(load_seconds, 2),
+        "transcribe_seconds": round(transcribe_seconds, 2),
+        "rtf": round(transcribe_seconds / audio_seconds, 4) if audio_seconds else None,
+        "wer": round(errors / words, 4) if words else None,
+    }
+
+
+def main() -> None:
+    from classes.transcription import ENGINES
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clips", type=Path)
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--beam-size", type=int, default=1)
+    parser.add_argument("--engine", choices=ENGINES, help="internal")
+    args = parser.parse_args()
+
+    if args.engine:
+        print(json.dumps(run_engine(args)))
+        return
+
+    if not find_clips(args.clips):
+        sys.exit(f"No audio clips with a .txt reference in {args.clips}")
+    for engine in args.engines:
+        out = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                str(args.clips),
+                "--model",
+                args.model,
+                "--threads",
+                str(args.threads),
+                "--beam-size",
+                str(args.beam_size),
+                "--engine",
+                engine,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        print(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
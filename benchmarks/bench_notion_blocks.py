@@ -0,0 +1,84 @@
+"""Micro-benchmark of how Notion payloads are packed.
+
+Builds the page sections of synthetic chunks and reports the number of
+blocks, the append requests needed when every chunk is published on its own
+and when consecutive chunks are coalesced, and the splitter's throughput.
+Runs offline; nothing is sent to Notion.
+
+Usage:
+    python benchmarks/bench_notion_blocks.py --chunks 12 --words 3000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fakes import FakeOpenAI  # noqa: E402
+from synthetic import synthetic_transcript  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=12)
+    parser.add_argument("--words", type=int, default=3000, help="words per chunk")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("NOTION_DB_ID", "bench-db")
+    from classes.chunk import Chunk
+    from classes.notion import NotionPage
+    from classes.notion_blocks import pack_requests, split_text
+    from classes.notion_client import NotionClient
+    from classes.recordings import Language, Recording
+
+    words = synthetic_transcript(args.chunks * args.words).split()
+    chunks = [
+        " ".join(words[start : start + args.words])
+        for start in range(0, len(words), args.words)
+    ]
+    enriched = [
+        Chunk(**FakeOpenAI.make_reply(text.split()), transcript=text)
+        for text in chunks
+    ]
+    recording = Recording(
+        Path("bench.m4a"), "bench", Language.ENGLISH, "bench", 3600, "Benchmarks"
+    )
+    # With a page id and no manifest, building payloads sends no request.
+    page = NotionPage(recording, page_id="bench", client=NotionClient("bench"))
+    sections = [
+        page._create_chunk_payload(chunk, idx)["children"]
+        for idx, chunk in enumerate(enriched, start=1)
+    ]
+    blocks = [block for section in sections for block in section]
+
+    text = " ".join(chunks)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        split_text(text)
+        timings.append(time.perf_counter() - start)
+    seconds = statistics.median(timings)
+
+    result = {
+        "chunks": len(sections),
+        "characters": len(text),
+        "blocks": len(blocks),
+        "blocks_per_chunk": round(len(blocks) / len(sections), 1),
+        "requests_per_chunk_publish": sum(len(pack_requests(s)) for s in sections),
+        "requests_coalesced": len(pack_requests(blocks)),
+        "split_mb_per_second": round(len(text) / seconds / 1e6, 1),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Offline end-to-end benchmarks against local OpenAI and Notion stand-ins.
+
+Runs chunking, enrichment, publishing and the full pipeline on synthetic
+inputs, with the API endpoints served by `fakes.FakeOpenAI` and
+`fakes.FakeNotion` (configurable latency, injected 429s and rate limits)
+and Whisper replaced by a model with a fixed real-time factor. No API key,
+spend or network is needed; the full-pipeline section needs ffmpeg.
+
+Results are written to benchmarks/results/ and compared with the previous
+run (or the file given with --compare), so regressions show up as deltas.
+
+Usage:
+    python benchmarks/bench_pipeline.py --openai-latency 0.5 --notion-rps 3
+    python benchmarks/bench_pipeline.py --only chunking enrichment
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+SECTIONS = ("chunking", "enrichment", "publishing", "pipeline")
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fakes import FakeNotion, FakeOpenAI  # noqa: E402
+from synthetic import (  # noqa: E402
+    FakeWhisperModel,
+    synthetic_transcript,
+    write_recording,
+)
+
+
+def _configure(openai: FakeOpenAI, notion: FakeNotion, tmp: Path, args) -> None:
+    """Point the project's config at the fakes; must run before importing it."""
+    os.environ.update(
+        {
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": openai.url,
+            "OPENAI_MAX_CONCURRENCY": str(args.concurrency),
+            "NOTION_API_KEY": "bench",
+            "NOTION_DB_ID": "bench-db",
+            "NOTION_BASE_URL": notion.url,
+            "NOTION_RPS": str(args.notion_rps),
+            "NOTION_MAX_RETRIES": "8",
+            "LLM_CACHE_ENABLED": "0",
+            "CHECKPOINTS_PATH": str(tmp / "state"),
+            "METRICS_DIR": str(tmp / "metrics"),
+        }
+    )
+
+
+def _calls(*services) -> tuple[int, int]:
+    return sum(s.total_calls for s in services), sum(s.throttled for s in services)
+
+
+# ---------------------------------------------------------------------------
+#  Sections
+# ---------------------------------------------------------------------------
+def bench_chunking(args, transcript: str) -> dict:
+    from classes.chatGPT import ChatGPTUtils
+    from classes.recordings import Language
+    from classes.utils import get_chunks_from_transcription
+
+    budget = ChatGPTUtils(args.model, cache=None).chunk_token_budget(Language.ENGLISH)
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        chunks = get_chunks_from_transcription(transcript, max_tokens=budget)
+        times.append(time.perf_counter() - start)
+    seconds = statistics.median(times)
+    return {
+        "seconds": round(seconds, 4),
+        "words_per_second": round(args.words / seconds),
+        "chunks": len(chunks),
+    }
+
+
+def bench_enrichment(args, openai: FakeOpenAI, chunks: list[str]) -> dict:
+    from classes.chatGPT import ChatGPTUtils
+    from classes.recordings import Language
+
+    utils = ChatGPTUtils(args.model, cache=None)
+    utils.client  # import the SDK outside the timed region
+    calls, throttled = _calls(openai)
+    start = time.perf_counter()
+    enriched = list(utils.get_additional_info_many(chunks, Language.ENGLISH))
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "chunks_per_second": round(len(enriched) / seconds, 3),
+        "requests": openai.total_calls - calls,
+        "throttled": openai.throttled - throttled,
+    }
+
+
+def bench_publishing(args, notion: FakeNotion, chunks: list[str], tmp: Path) -> dict:
+    from classes.chunk import Chunk
+    from classes.notion import NotionPage
+    from classes.notion_manifest import ManifestStore
+    from classes.recordings import Language, Recording
+
+    enriched = [
+        Chunk(**FakeOpenAI.make_reply(text.split()), transcript=text)
+        for text in chunks
+    ]
+    recording = Recording(
+        Path("bench.m4a"), "bench", Language.ENGLISH, "bench", 3600, "Benchmarks"
+    )
+    manifests = ManifestStore(tmp / "notion_pages")
+
+    def publish() -> NotionPage:
+        page = NotionPage(recording, recording_id="bench", manifests=manifests)
+        page.publish_chunks(list(enumerate(enriched, start=1)))
+        return page
+
+    calls, throttled = _calls(notion)
+    start = time.perf_counter()
+    page = publish()
+    seconds = time.perf_counter() - start
+    requests = notion.total_calls - calls
+    # Publishing the same content again only confirms the page exists.
+    calls = notion.total_calls
+    publish()
+    return {
+        "seconds": round(seconds, 3),
+        "chunks_per_second": round(len(enriched) / seconds, 3),
+        "requests": requests,
+        "throttled": notion.throttled - throttled,
+        "blocks": len(notion.children[page.page_id]),
+        "republish_requests": notion.total_calls - calls,
+    }
+
+
+def bench_pipeline(args, openai: FakeOpenAI, notion: FakeNotion, tmp: Path) -> dict:
+    if shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None:
+        return {"skipped": "ffmpeg/ffprobe not found"}
+
+    from classes.chatGPT import ChatGPTUtils
+    from classes.checkpoint import CheckpointStore
+    from classes.processor import RecordingJob, RecordingProcessor
+    from classes.utils import get_paths
+
+    root = tmp / "recordings"
+    for n in range(args.recordings):
+        write_recording(root / "Benchmarks" / f"lecture-{n}.m4a", args.seconds, seed=n)
+    paths = get_paths(root)
+
+    failures: list[str] = []
+    processor = RecordingProcessor(
+        FakeWhisperModel(rtf=args.whisper_rtf),
+        ChatGPTUtils(args.model, cache=None),
+        CheckpointStore(tmp / "state"),
+    )
+    pipeline = processor.build_pipeline(
+        on_error=lambda job, stage, exc: failures.append(f"{stage.name}: {exc}")
+    )
+    calls, throttled = _calls(openai, notion)
+    start = time.perf_counter()
+    finished = pipeline.run(RecordingJob(path) for path in paths)
+    seconds = time.perf_counter() - start
+    total_calls, total_throttled = _calls(openai, notion)
+    return {
+        "seconds": round(seconds, 3),
+        "recordings": len(finished),
+        "audio_seconds_per_second": round(len(finished) * args.seconds / seconds, 2),
+        "requests": total_calls - calls,
+        "throttled": total_throttled - throttled,
+        "failures": failures,
+    }
+
+
+# ---------------------------------------------------------------------------
+#  Results
+# ---------------------------------------------------------------------------
+def _previous(path: Path | None) -> dict | None:
+    if path is None:
+        runs = sorted(RESULTS_DIR.glob("pipeline-*.json"))
+        path = runs[-1] if runs else None
+    if path is None or not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _compare(current: dict, previous: dict) -> None:
+    print(f"\nCompared with {previous['run']}:")
+    for section, values in current["results"].items():
+        before = previous["results"].get(section, {})
+        for key, value in values.items():
+            old = before.get(key)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+                continue
+            delta = f"{(value - old) / old:+.1%}" if old else "n/a"
+            print(f"  {section}.{key}: {old} -> {value} ({delta})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=SECTIONS, default=SECTIONS)
+    parser.add_argument("--model", default="gpt-4o")
+    parser.add_argument("--words", type=int, default=60_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--openai-latency", type=float, default=0.5)
+    parser.add_argument("--notion-latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--openai-rate-limit", type=float, default=0.0)
+    parser.add_argument("--notion-rate-limit", type=float, default=3.0)
+    parser.add_argument("--notion-rps", type=float, default=3.0)
+    parser.add_argument("--recordings", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=600.0)
+    parser.add_argument("--whisper-rtf", type=float, default=0.05)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    openai = FakeOpenAI(
+        latency=args.openai_latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.openai_rate_limit,
+    )
+    notion = FakeNotion(
+        latency=args.notion_latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.notion_rate_limit,
+        seed=1,
+    )
+    results: dict[str, dict] = {}
+    with openai, notion, tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        _configure(openai, notion, tmp, args)
+        # Prompts are read relative to the working directory.
+        os.chdir(ROOT)
+
+        from classes.chatGPT import ChatGPTUtils
+        from classes.recordings import Language
+        from classes.utils import get_chunks_from_transcription
+
+        transcript = synthetic_transcript(args.words)
+        budget = ChatGPTUtils(args.model, cache=None).chunk_token_budget(
+            Language.ENGLISH
+        )
+        chunks = get_chunks_from_transcription(transcript, max_tokens=budget)
+
+        for section in SECTIONS:
+            if section not in args.only:
+                continue
+            if section == "chunking":
+                results[section] = bench_chunking(args, transcript)
+            elif section == "enrichment":
+                results[section] = bench_enrichment(args, openai, chunks)
+            elif section == "publishing":
+                results[section] = bench_publishing(args, notion, chunks, tmp)
+            else:
+                results[section] = bench_pipeline(args, openai, notion, tmp)
+            print(section, json.dumps(results[section]))
+
+    failed = [name for name, values in results.items() if values.get("failures")]
+    if failed:
+        # A broken run must never become the baseline of the next comparison.
+        sys.exit(f"Failures in {', '.join(failed)}; results not saved.")
+
+    current = {
+        "run": time.strftime("%Y%m%dT%H%M%S"),
+        "args": {k: str(v) for k, v in vars(args).items()},
+        "results": results,
+    }
+    previous = _previous(args.compare)
+    if previous is not None:
+        _compare(current, previous)
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        out = RESULTS_DIR / f"pipeline-{current['run']}.json"
+        out.write_text(json.dumps(current, indent=2), encoding="utf-8")
+        print(f"\nSaved {out.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
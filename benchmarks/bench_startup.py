@@ -0,0 +1,72 @@
+"""Guard the start-up cost of a run with nothing to do.
+
+Times ``import main`` and ``main.py --plan`` against an empty recordings
+folder in fresh interpreters and exits non-zero when the median exceeds the
+budget, or when an import that should be lazy (whisper, torch, tiktoken,
+openai) happens at start-up.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --max-seconds 1.0
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LAZY_MODULES = ("whisper", "torch", "tiktoken", "openai")
+
+IMPORT_PROBE = f"""
+import json, sys
+sys.path.insert(0, {str(ROOT)!r})
+import main
+print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))
+"""
+
+
+def _time(cmd: list[str], cwd: Path) -> tuple[float, str]:
+    start = time.perf_counter()
+    out = subprocess.run(cmd, cwd=cwd, check=True, capture_output=True, text=True)
+    return time.perf_counter() - start, out.stdout
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = Path(tmp)
+        (cwd / "recordings").mkdir()
+
+        import_times, plan_times = [], []
+        eager: list[str] = []
+        for _ in range(args.runs):
+            elapsed, out = _time([sys.executable, "-c", IMPORT_PROBE], cwd)
+            import_times.append(elapsed)
+            eager = json.loads(out.strip().splitlines()[-1])
+            elapsed, _ = _time([sys.executable, str(ROOT / "main.py"), "--plan"], cwd)
+            plan_times.append(elapsed)
+
+    result = {
+        "import_median_s": round(statistics.median(import_times), 3),
+        "plan_median_s": round(statistics.median(plan_times), 3),
+        "eager_imports": eager,
+        "budget_s": args.max_seconds,
+    }
+    print(json.dumps(result))
+
+    if eager:
+        sys.exit(f"Modules imported eagerly at start-up: {', '.join(eager)}")
+    if result["plan_median_s"] > args.max_seconds:
+        sys.exit("Start-up regression: --plan exceeded the time budget")
+
+
+if __name__ == "__main__":
+    main()
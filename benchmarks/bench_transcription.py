@@ -0,0 +1,133 @@
+"""Compare single-process and parallel Whisper transcription.
+
+Each mode runs in a fresh subprocess so model loading and memory are
+measured in isolation. Peak RSS is sampled from /proc over the benchmark
+process and all of its children (Linux only).
+
+Usage:
+    python benchmarks/bench_transcription.py recordings/lecture.mp3 \
+        --model medium --workers 4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _descendants(pid: int) -> list[int]:
+    pids = [pid]
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children", encoding="utf-8") as f:
+                for child in f.read().split():
+                    pids.extend(_descendants(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def _sample_peak_rss(pid: int, stop: threading.Event, peak: list[int]) -> None:
+    while not stop.is_set():
+        peak[0] = max(peak[0], sum(_rss_kb(p) for p in _descendants(pid)))
+        stop.wait(0.2)
+
+
+def run_mode(mode: str, audio: Path, model_name: str, workers: int) -> dict:
+    """Transcribe *audio* in this process and return the measurements."""
+    stop = threading.Event()
+    peak = [0]
+    sampler = threading.Thread(
+        target=_sample_peak_rss, args=(os.getpid(), stop, peak), daemon=True
+    )
+    sampler.start()
+
+    start = time.perf_counter()
+    if mode == "single":
+        import whisper
+
+        model = whisper.load_model(model_name)
+        loaded = time.perf_counter()
+        text = model.transcribe(str(audio))["text"]
+    else:
+        from classes.transcription import ParallelTranscriber
+
+        model = ParallelTranscriber(model_name, workers)
+        loaded = time.perf_counter()
+        text = model.transcribe(audio)["text"]
+        model.close()
+    end = time.perf_counter()
+
+    stop.set()
+    sampler.join()
+    return {
+        "mode": mode,
+        "workers": workers if mode == "parallel" else 1,
+        "wall_seconds": round(end - start, 2),
+        "transcribe_seconds": round(end - loaded, 2),
+        "peak_rss_mb": round(peak[0] / 1024, 1),
+        "characters": len(text),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("audio", type=Path)
+    parser.add_argument("--model", default="medium")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--mode", choices=["single", "parallel"], help="internal")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.audio, args.model, args.workers)))
+        return
+
+    results = []
+    for mode in ("single", "parallel"):
+        out = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                str(args.audio),
+                "--model",
+                args.model,
+                "--workers",
+                str(args.workers),
+                "--mode",
+                mode,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    for result in results:
+        print(json.dumps(result))
+    single, parallel = results
+    print(
+        f"speed-up: {single['wall_seconds'] / parallel['wall_seconds']:.2f}x, "
+        f"peak RSS: {parallel['peak_rss_mb'] / single['peak_rss_mb']:.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+"""Local stand-ins for the OpenAI and Notion endpoints used by the pipeline.
+
+Both fakes run a threaded HTTP server in the background and can add
+latency, inject 429 answers at random and enforce a request rate, so
+throughput can be measured without API keys, spend or network.
+
+    with FakeOpenAI(latency=0.8) as openai, FakeNotion(rate_limit=3) as notion:
+        os.environ["OPENAI_BASE_URL"] = openai.url
+        os.environ["NOTION_BASE_URL"] = notion.url
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Callable
+from email.parser import BytesParser
+from email.policy import default
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+Handler = Callable[[re.Match, dict[str, Any]], tuple[int, dict[str, Any] | str]]
+
+
+class FakeService:
+    """Threaded local HTTP server with latency, 429 injection and rate limits.
+
+    *latency* (plus up to *jitter*) seconds are added to every answer,
+    *error_rate* is the share of requests answered with a random 429 and
+    *rate_limit* (requests per second, 0 = off) makes the server answer 429
+    with a ``Retry-After`` header once clients go faster than that.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.calls: Counter[str] = Counter()
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._allowance = max(rate_limit, 1.0)
+        self._last_check = time.monotonic()
+        self._routes: list[tuple[str, re.Pattern, str, Handler]] = []
+        self._server: ThreadingHTTPServer | None = None
+
+    # ------------------------------------------------------------------
+    #  Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> "FakeService":
+        service = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                service._dispatch(self, "GET")
+
+            def do_POST(self):
+                service._dispatch(self, "POST")
+
+            def do_PATCH(self):
+                service._dispatch(self, "PATCH")
+
+            def do_DELETE(self):
+                service._dispatch(self, "DELETE")
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeService":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def route(self, method: str, pattern: str, name: str, handler: Handler) -> None:
+        self._routes.append((method, re.compile(f"^/v1/{pattern}$"), name, handler))
+
+    # ------------------------------------------------------------------
+    #  Request handling
+    # ------------------------------------------------------------------
+    def _dispatch(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        length = int(request.headers.get("Content-Length") or 0)
+        raw = request.rfile.read(length) if length else b""
+        content_type = request.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            body = _parse_multipart(content_type, raw)
+        else:
+            body = json.loads(raw) if raw else {}
+        path = request.path.split("?")[0]
+
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        retry_after = self._throttle()
+        if retry_after is not None:
+            self._send(request, 429, {"error": "rate_limited"}, retry_after)
+            return
+
+        for route_method, pattern, name, handler in self._routes:
+            match = pattern.match(path)
+            if route_method == method and match:
+                with self._lock:
+                    self.calls[name] += 1
+                status, payload = handler(match, body)
+                self._send(request, status, payload)
+                return
+        self._send(request, 404, {"error": f"no route for {method} {path}"})
+
+    def _throttle(self) -> float | None:
+        """Return a Retry-After value if this request must be rejected."""
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.throttled += 1
+                return 0.0
+            if not self.rate_limit:
+                return None
+            now = time.monotonic()
+            self._allowance = min(
+                max(self.rate_limit, 1.0),
+                self._allowance + (now - self._last_check) * self.rate_limit,
+            )
+            self._last_check = now
+            if self._allowance >= 1:
+                self._allowance -= 1
+                return None
+            self.throttled += 1
+            return (1 - self._allowance) / self.rate_limit
+
+    @staticmethod
+    def _send(
+        request: BaseHTTPRequestHandler,
+        status: int,
+        payload: dict[str, Any] | str,
+        retry_after: float | None = None,
+    ) -> None:
+        # Strings are sent as-is, e.g. the JSONL content of a file.
+        is_text = isinstance(payload, str)
+        data = (payload if is_text else json.dumps(payload)).encode("utf-8")
+        request.send_response(status)
+        content_type = "application/octet-stream" if is_text else "application/json"
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(data)))
+        if retry_after is not None:
+            request.send_header("Retry-After", f"{retry_after:.2f}")
+        request.end_headers()
+        request.wfile.write(data)
+
+
+class FakeOpenAI(FakeService):
+    """Stand-in for ``POST /v1/responses`` and the Files and Batches APIs.
+
+    The reply is derived from the transcript in the prompt, so its size
+    scales with the input like the real summaries do; *bad_json_rate* of
+    the replies are cut off mid-way to exercise the repair path. A batch
+    completes *batch_seconds* after creation; *batch_error_rate* of its
+    requests end up in the error file instead of the output file.
+    """
+
+    def __init__(
+        self,
+        batch_seconds: float = 0.0,
+        batch_error_rate: float = 0.0,
+        bad_json_rate: float = 0.0,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.bad_json_rate = bad_json_rate
+        self.batch_seconds = batch_seconds
+        self.batch_error_rate = batch_error_rate
+        self.files: dict[str, str] = {}
+        self.batches: dict[str, dict[str, Any]] = {}
+        self.route("POST", "responses", "responses", self._responses)
+        self.route("POST", "files", "files.create", self._create_file)
+        self.route("GET", r"files/([\w-]+)/content", "files.content", self._content)
+        self.route("POST", "batches", "batches.create", self._create_batch)
+        self.route("GET", r"batches/([\w-]+)", "batches.retrieve", self._batch)
+
+    def _responses(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        response = self.make_response(body.get("model", "gpt-4o"), _prompt(body))
+        with self._lock:
+            truncate = self._random.random() < self.bad_json_rate
+        if truncate:
+            part = response["output"][0]["content"][0]
+            part["text"] = part["text"][: len(part["text"]) * 2 // 3]
+        return 200, response
+
+    def _create_file(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        file_id = f"file-{uuid.uuid4().hex}"
+        with self._lock:
+            self.files[file_id] = body["file"].decode("utf-8")
+        return 200, self._file_object(file_id, body.get("purpose", "batch"))
+
+    def _content(self, match: re.Match, body: dict[str, Any]) -> tuple[int, Any]:
+        with self._lock:
+            content = self.files.get(match.group(1))
+        if content is None:
+            return 404, {"error": {"message": "No such file"}}
+        return 200, content
+
+    def _create_batch(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        with self._lock:
+            self.batches[batch_id] = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": body["endpoint"],
+                "input_file_id": body["input_file_id"],
+                "completion_window": body["completion_window"],
+                "status": "in_progress",
+                "created_at": int(time.time()),
+                "output_file_id": None,
+                "error_file_id": None,
+                "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            }
+        return 200, self.batches[batch_id]
+
+    def _batch(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        with self._lock:
+            batch = self.batches.get(match.group(1))
+            if batch is None:
+                return 404, {"error": {"message": "No such batch"}}
+            due = batch["created_at"] + self.batch_seconds
+            if batch["status"] == "in_progress" and time.time() >= due:
+                self._complete(batch)
+            return 200, dict(batch)
+
+    def _complete(self, batch: dict[str, Any]) -> None:
+        """Run every request of *batch*, splitting output and error lines."""
+        output, errors = [], []
+        for line in self.files[batch["input_file_id"]].splitlines():
+            request = json.loads(line)
+            result = {"id": f"batch_req_{uuid.uuid4().hex}", "error": None}
+            result["custom_id"] = request["custom_id"]
+            if self._random.random() < self.batch_error_rate:
+                error = {"error": {"message": "Injected failure", "type": "server"}}
+                result["response"] = {"status_code": 500, "body": error}
+                errors.append(json.dumps(result))
+                continue
+            response = self.make_response(
+                request["body"].get("model", "gpt-4o"), _prompt(request["body"])
+            )
+            result["response"] = {"status_code": 200, "body": response}
+            output.append(json.dumps(result))
+        for key, lines in (("output_file_id", output), ("error_file_id", errors)):
+            if lines:
+                file_id = f"file-{uuid.uuid4().hex}"
+                self.files[file_id] = "\n".join(lines) + "\n"
+                batch[key] = file_id
+        batch["status"] = "completed"
+        batch["request_counts"] = {
+            "total": len(output) + len(errors),
+            "completed": len(output),
+            "failed": len(errors),
+        }
+
+    def _file_object(self, file_id: str, purpose: str) -> dict[str, Any]:
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(self.files[file_id]),
+            "created_at": int(time.time()),
+            "filename": f"{file_id}.jsonl",
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    @staticmethod
+    def make_response(model: str, prompt: str) -> dict[str, Any]:
+        words = prompt.split()
+        text = json.dumps(FakeOpenAI.make_reply(words))
+        return {
+            "id": f"resp_{uuid.uuid4().hex}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": model,
+            "status": "completed",
+            "error": None,
+            "output": [
+                {
+                    "type": "message",
+                    "id": f"msg_{uuid.uuid4().hex}",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [
+                        {"type": "output_text", "text": text, "annotations": []}
+                    ],
+                }
+            ],
+            "usage": {
+                "input_tokens": len(words) * 4 // 3,
+                "output_tokens": len(text) // 4,
+                "total_tokens": len(words) * 4 // 3 + len(text) // 4,
+            },
+        }
+
+    @staticmethod
+    def make_reply(words: list[str]) -> dict[str, Any]:
+        head = " ".join(words[-8:]) or "Empty lecture"
+        summary = " ".join(words[-300:])
+        return {
+            "title": head[:60],
+            "summary": summary,
+            "main_points": [" ".join(words[i : i + 40]) for i in range(0, 400, 40)],
+            "follow_up": [f"Why {w}?" for w in words[-5:]],
+        }
+
+
+class FakeNotion(FakeService):
+    """Stand-in for the Notion pages, blocks and databases endpoints.
+
+    Pages and blocks are kept in memory so benchmarks can check what was
+    published. Appending honours the ``after`` parameter.
+    """
+
+    PROPERTIES = {
+        "Title": "title",
+        "Duration (seconds)": "number",
+        "Subject": "select",
+        "Who": "select",
+        "Recording ID": "rich_text",
+    }
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.pages: dict[str, dict[str, Any]] = {}
+        self.children: dict[str, list[dict[str, Any]]] = {}
+        self.route("POST", "pages", "pages.create", self._create_page)
+        self.route("PATCH", r"pages/([\w-]+)", "pages.update", self._update_page)
+        self.route(
+            "PATCH", r"blocks/([\w-]+)/children", "blocks.append", self._append
+        )
+        self.route("GET", r"blocks/([\w-]+)/children", "blocks.list", self._list)
+        self.route("DELETE", r"blocks/([\w-]+)", "blocks.delete", self._delete)
+        self.route("GET", r"databases/([\w-]+)", "databases.get", self._database)
+        self.route("PATCH", r"databases/([\w-]+)", "databases.update", self._database)
+        self.route("POST", r"databases/([\w-]+)/query", "databases.query", self._query)
+
+    def _create_page(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        page_id = str(uuid.uuid4())
+        with self._lock:
+            self.pages[page_id] = {
+                "id": page_id,
+                "object": "page",
+                "properties": body.get("properties", {}),
+            }
+            self.children[page_id] = self._with_ids(body.get("children", []))
+        return 200, self.pages[page_id]
+
+    def _update_page(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        with self._lock:
+            page = self.pages.get(match.group(1))
+            if page is None:
+                return 404, {"code": "object_not_found"}
+            page["properties"].update(body.get("properties", {}))
+        return 200, page
+
+    def _append(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        parent = match.group(1)
+        blocks = self._with_ids(body.get("children", []))
+        if len(blocks) > 100:
+            return 400, {"message": "body.children.length should be ≤ 100"}
+        with self._lock:
+            siblings = self.children.setdefault(parent, [])
+            position = len(siblings)
+            if body.get("after"):
+                ids = [block["id"] for block in siblings]
+                position = ids.index(body["after"]) + 1
+            siblings[position:position] = blocks
+        return 200, {"object": "list", "results": blocks}
+
+    def _list(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        with self._lock:
+            blocks = list(self.children.get(match.group(1), []))
+        return 200, {"object": "list", "results": blocks, "has_more": False}
+
+    def _delete(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        block_id = match.group(1)
+        with self._lock:
+            for siblings in self.children.values():
+                siblings[:] = [b for b in siblings if b["id"] != block_id]
+        return 200, {"id": block_id, "archived": True}
+
+    def _database(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        properties = {name: {"type": t} for name, t in self.PROPERTIES.items()}
+        return 200, {"id": match.group(1), "properties": properties}
+
+    def _query(self, match: re.Match, body: dict[str, Any]) -> tuple[int, dict]:
+        with self._lock:
+            pages = [
+                page
+                for page in self.pages.values()
+                if _matches(page["properties"], body.get("filter", {}))
+            ]
+        return 200, {"object": "list", "results": pages, "has_more": False}
+
+    @staticmethod
+    def _with_ids(blocks: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [
+            {"id": str(uuid.uuid4()), "object": "block", "type": next(iter(b)), **b}
+            for b in blocks
+        ]
+
+
+def _matches(properties: dict[str, Any], query: dict[str, Any]) -> bool:
+    """Evaluate the small subset of Notion filters the pipeline uses."""
+    if not query:
+        return True
+    if "and" in query:
+        return all(_matches(properties, q) for q in query["and"])
+    prop = properties.get(query.get("property"), {})
+    if "title" in query:
+        text = "".join(t["text"]["content"] for t in prop.get("title", []))
+        return text == query["title"].get("equals")
+    if "rich_text" in query:
+        text = "".join(t["text"]["content"] for t in prop.get("rich_text", []))
+        return text == query["rich_text"].get("equals")
+    if "select" in query:
+        return (prop.get("select") or {}).get("name") == query["select"].get("equals")
+    return False
+
+
+def _prompt(body: dict[str, Any]) -> str:
+    return " ".join(m.get("content", "") for m in body.get("input", []))
+
+
+def _parse_multipart(content_type: str, raw: bytes) -> dict[str, Any]:
+    """Return the form fields of a multipart body; file parts stay bytes."""
+    message = BytesParser(policy=default).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + raw
+    )
+    fields: dict[str, Any] = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        payload = part.get_payload(decode=True)
+        fields[name] = payload if part.get_filename() else payload.decode("utf-8")
+    return fields
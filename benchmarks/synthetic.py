@@ -0,0 +1,100 @@
+"""Synthetic inputs for the offline benchmarks.
+
+Transcripts are built from a fixed vocabulary with a seeded generator, so
+two runs of a benchmark see exactly the same text. Audio is a sequence of
+tone bursts separated by pauses, which is enough for ffmpeg, the silence
+detector and a fake Whisper model; it is not meant to be recognisable
+speech.
+"""
+
+import random
+import subprocess
+import time
+import wave
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+# Roughly the pace of a lecturer.
+WORDS_PER_SECOND = 2.5
+
+_VOCABULARY = (
+    "the of and to in is that for it as was with be by on not this are at from "
+    "gradient matrix vector theorem proof function integral derivative limit "
+    "network layer model data training loss error sample distribution variance "
+    "protocol packet router kernel memory process thread scheduler cache page "
+    "therefore however notice remember example consider suppose assume finally"
+).split()
+
+
+def synthetic_transcript(words: int, seed: int = 0) -> str:
+    """Return *words* words of lecture-like text with sentence punctuation."""
+    rng = random.Random(seed)
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(6, 30))
+        sentence = " ".join(rng.choice(_VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + rng.choice(".!?" + "." * 6))
+        remaining -= length
+    return " ".join(sentences)
+
+
+def synthetic_audio(seconds: float, seed: int = 0) -> np.ndarray:
+    """Return float32 samples of tone bursts separated by short pauses."""
+    rng = np.random.default_rng(seed)
+    audio = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    pos = 0
+    while pos < len(audio):
+        burst = int(rng.uniform(1.0, 6.0) * SAMPLE_RATE)
+        t = np.arange(min(burst, len(audio) - pos)) / SAMPLE_RATE
+        tone = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 400) * t)
+        audio[pos : pos + len(t)] = tone + rng.normal(0, 0.01, len(t))
+        pos += len(t) + int(rng.uniform(0.3, 1.5) * SAMPLE_RATE)
+    return audio
+
+
+def write_recording(path: Path, seconds: float, seed: int = 0) -> Path:
+    """Write synthetic audio to *path*, converted by ffmpeg unless ``.wav``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wav_path = path.with_suffix(".wav")
+    pcm = (synthetic_audio(seconds, seed) * 32767).astype(np.int16)
+    with wave.open(str(wav_path), "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(SAMPLE_RATE)
+        file.writeframes(pcm.tobytes())
+    if path.suffix != ".wav":
+        subprocess.run(
+            ["ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-i", wav_path, path],
+            check=True,
+        )
+        wav_path.unlink()
+    return path
+
+
+class FakeWhisperModel:
+    """Stands in for a Whisper model at a configurable real-time factor.
+
+    ``transcribe`` sleeps ``rtf`` seconds per second of audio and returns
+    synthetic text of matching length, with one segment per ~10 s.
+    """
+
+    def __init__(self, rtf: float = 0.0, seed: int = 0):
+        self.rtf = rtf
+        self.seed = seed
+        self.calls = 0
+
+    def transcribe(self, audio: Any, **kwargs: Any) -> dict[str, Any]:
+        seconds = len(audio) / SAMPLE_RATE
+        time.sleep(seconds * self.rtf)
+        self.calls += 1
+        segments = []
+        for n, start in enumerate(np.arange(0, seconds, 10.0)):
+            end = min(seconds, start + 10.0)
+            words = max(1, int((end - start) * WORDS_PER_SECOND))
+            text = synthetic_transcript(words, seed=self.seed + self.calls * 1000 + n)
+            segments.append({"start": start, "end": end, "text": " " + text})
+        return {"text": "".join(s["text"] for s in segments), "segments": segments}
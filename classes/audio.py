@@ -0,0 +1,263 @@
+import bisect
+import json
+import subprocess
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+# Frame length used for loudness analysis.
+FRAME_MS = 10
+# Frames quieter than this are always silence, however quiet the recording.
+SILENCE_FLOOR_DB = -50.0
+
+_MISSING_FFMPEG = (
+    "{tool} not found: install ffmpeg (which ships ffmpeg and ffprobe) "
+    "and make sure it is on PATH."
+)
+
+
+def probe_duration(audio_path: Path) -> float:
+    """Return the duration in seconds read from the container metadata.
+
+    Only the file header is parsed (via ffprobe); nothing is decoded.
+    Raises ``RuntimeError`` if the duration cannot be determined and
+    ``EnvironmentError`` if ffprobe is not installed.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-show_entries",
+                "format=duration",
+                "-of",
+                "json",
+                str(audio_path),
+            ],
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        raise EnvironmentError(_MISSING_FFMPEG.format(tool="ffprobe")) from None
+    try:
+        return float(json.loads(result.stdout)["format"]["duration"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise RuntimeError(
+            f"Could not read the duration of {audio_path}: {result.stderr.strip()}"
+        ) from exc
+
+
+def iter_audio_windows(
+    audio_path: Path,
+    window_seconds: float,
+    offset: float = 0.0,
+    duration: float | None = None,
+) -> Iterator[np.ndarray]:
+    """Decode *audio_path* with ffmpeg and yield it in fixed-size windows.
+
+    Samples are 16 kHz mono float32, as expected by Whisper. Only one window
+    is held in memory at a time.
+    """
+    span = ["-t", str(duration)] if duration is not None else []
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-threads",
+        "0",
+        "-ss",
+        str(offset),
+        *span,
+        "-i",
+        str(audio_path),
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-",
+    ]
+    window_bytes = int(window_seconds * SAMPLE_RATE) * 2  # 16-bit samples
+    try:
+        process = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        raise EnvironmentError(_MISSING_FFMPEG.format(tool="ffmpeg")) from None
+    try:
+        while True:
+            data = process.stdout.read(window_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
+
+
+def decode_audio(
+    audio_path: Path,
+    duration: float | None = None,
+    mmap_dir: Path | None = None,
+) -> np.ndarray:
+    """Decode the whole file once into a 16 kHz mono float32 buffer.
+
+    With a known *duration* the decoded windows are written straight into a
+    preallocated buffer instead of being concatenated. With *mmap_dir* the
+    buffer is a `numpy.memmap` backed by a temporary file there, which keeps
+    long recordings out of RAM and lets other processes map the same samples.
+    """
+    if duration is None:
+        duration = probe_duration(audio_path)
+    # Containers may under-report slightly; leave one second of headroom.
+    capacity = int((duration + 1) * SAMPLE_RATE)
+    if mmap_dir is not None:
+        Path(mmap_dir).mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=mmap_dir, suffix=".f32", delete=False
+        ) as backing:
+            filename = backing.name
+        buffer = np.memmap(filename, np.float32, mode="w+", shape=(capacity,))
+    else:
+        buffer = np.empty(capacity, np.float32)
+
+    filled = 0
+    for window in iter_audio_windows(audio_path, 60.0):
+        if filled + len(window) > len(buffer):
+            # The metadata under-reported the duration: grow in memory.
+            release_audio(buffer)
+            buffer = np.concatenate([buffer[:filled], window])
+            filled = len(buffer)
+            continue
+        buffer[filled : filled + len(window)] = window
+        filled += len(window)
+    return buffer[:filled]
+
+
+def frame_dbfs(audio: np.ndarray, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """Loudness of consecutive *frame_ms* frames in dBFS."""
+    frame = SAMPLE_RATE * frame_ms // 1000
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.zeros(0, np.float32)
+    frames = np.asarray(audio[: n_frames * frame]).reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def detect_silence(
+    audio: np.ndarray,
+    min_silence_ms: int = 700,
+    silence_thresh_db: float | None = None,
+) -> list[tuple[int, int]]:
+    """Return (start, end) sample ranges quieter than *silence_thresh_db*.
+
+    Works like pydub's ``detect_silence`` on a decoded buffer. Only ranges
+    lasting at least *min_silence_ms* are reported. The threshold defaults
+    to 16 dB below the average loudness of *audio*, but never below
+    `SILENCE_FLOOR_DB`, so a recording that is silent throughout is still
+    found to be silent.
+    """
+    levels = frame_dbfs(audio)
+    if len(levels) == 0:
+        return []
+    if silence_thresh_db is None:
+        mean_power = np.mean(np.square(np.asarray(audio), dtype=np.float64))
+        relative = 10 * np.log10(max(mean_power, 1e-20)) - 16
+        silence_thresh_db = max(relative, SILENCE_FLOOR_DB)
+
+    quiet = np.concatenate([[False], levels < silence_thresh_db, [False]])
+    edges = np.flatnonzero(np.diff(quiet.astype(np.int8)))
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    min_frames = max(1, min_silence_ms // FRAME_MS)
+    return [
+        (int(start) * frame, int(end) * frame)
+        for start, end in zip(edges[::2], edges[1::2])
+        if end - start >= min_frames
+    ]
+
+
+@dataclass
+class OffsetMap:
+    """Where the audio kept by `trim_silence` sits in the original buffer.
+
+    *spans* are the kept (start, end) sample ranges of the original, in
+    order; the trimmed buffer is their concatenation.
+    """
+
+    spans: list[tuple[int, int]]
+    original_samples: int
+
+    # Start of every span within the trimmed buffer.
+    _starts: list[int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._starts = []
+        position = 0
+        for start, end in self.spans:
+            self._starts.append(position)
+            position += end - start
+
+    @property
+    def skipped_seconds(self) -> float:
+        kept = sum(end - start for start, end in self.spans)
+        return (self.original_samples - kept) / SAMPLE_RATE
+
+    def to_original(self, seconds: float) -> float:
+        """Map a time in the trimmed audio to the same point in the original."""
+        if not self.spans:
+            return 0.0
+        sample = int(seconds * SAMPLE_RATE)
+        idx = max(0, bisect.bisect_right(self._starts, sample) - 1)
+        start, end = self.spans[idx]
+        return min(start + sample - self._starts[idx], end) / SAMPLE_RATE
+
+
+def trim_silence(
+    audio: np.ndarray,
+    min_skip_seconds: float,
+    padding_seconds: float = 0.25,
+    silence_thresh_db: float | None = None,
+) -> tuple[np.ndarray, OffsetMap]:
+    """Cut every silence of at least *min_skip_seconds* out of *audio*.
+
+    *padding_seconds* of each silence are kept on both sides, so word onsets
+    and endings survive and the remaining speech is still separated by a
+    short pause. Returns the trimmed buffer (*audio* itself if nothing was
+    cut) and the map back to the original timeline.
+    """
+    pad = int(padding_seconds * SAMPLE_RATE)
+    spans: list[tuple[int, int]] = []
+    kept_from = 0
+    min_silence_ms = int(min_skip_seconds * 1000)
+    for start, end in detect_silence(audio, min_silence_ms, silence_thresh_db):
+        cut_start, cut_end = start + pad, end - pad
+        if cut_end <= cut_start:
+            continue
+        if cut_start > kept_from:
+            spans.append((kept_from, cut_start))
+        kept_from = cut_end
+    if kept_from < len(audio):
+        spans.append((kept_from, len(audio)))
+
+    offsets = OffsetMap(spans, len(audio))
+    if spans == [(0, len(audio))]:
+        return audio, offsets
+    if not spans:
+        return np.zeros(0, np.float32), offsets
+    return np.concatenate([audio[start:end] for start, end in spans]), offsets
+
+
+def release_audio(audio: np.ndarray | None) -> None:
+    """Drop a buffer from `decode_audio`, removing its backing file if any."""
+    filename = getattr(audio, "filename", None)
+    if filename:
+        Path(filename).unlink(missing_ok=True)
@@ -0,0 +1,202 @@
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import config
+
+from .chatGPT import ChatGPTUtils
+from .checkpoint import CheckpointStore, RecordingState
+from .metrics import metrics
+from .recordings import Language
+
+# Terminal states of an OpenAI batch.
+_FINISHED = {"completed", "failed", "expired", "cancelled"}
+
+
+@dataclass
+class BatchEnricher:
+    """Enrich the chunks of many recordings through the OpenAI Batch API.
+
+    The request of every chunk not yet enriched (and not in the response
+    cache) is written to a JSONL file and submitted as one batch; results
+    are mapped back by custom id into the recordings' checkpoints. Each
+    submitted batch is recorded under *root* before and after creation, so
+    a restarted run waits for it instead of submitting the chunks again.
+    Chunks whose request failed are left pending for the synchronous path.
+    """
+
+    gpt_utils: ChatGPTUtils
+    store: CheckpointStore
+    root: Path = config.BATCH_PATH
+    poll_seconds: float = config.BATCH_POLL_SECONDS
+    max_requests: int = config.BATCH_MAX_REQUESTS
+
+    def __post_init__(self):
+        self.root = Path(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    #  Public API
+    # ------------------------------------------------------------------
+    def run(self, states: list[tuple[RecordingState, Language]]) -> dict[str, int]:
+        """Enrich the pending chunks of *states* and return the counts.
+
+        Batches left by an interrupted run are awaited first; their results
+        are only applied to recordings in *states*. *states* are the
+        checkpoints of chunked recordings with their language.
+        """
+        counts = {"submitted": 0, "enriched": 0, "failed": 0, "cached": 0}
+        by_hash = {state.audio_hash: state for state, _ in states}
+        for record_path in sorted(self.root.glob("*.json")):
+            self._finish(record_path, by_hash, counts)
+
+        requests: list[tuple[str, str, int, Language, dict[str, Any]]] = []
+        for state, language in states:
+            cached_any = False
+            for idx, text in enumerate(state.chunks or [], start=1):
+                if idx in state.enriched:
+                    continue
+                cached = self.gpt_utils.cached_chunk(text, language)
+                if cached is not None:
+                    state.enriched[idx] = cached
+                    counts["cached"] += 1
+                    cached_any = True
+                    continue
+                body = self.gpt_utils.chunk_request(text, language)
+                custom_id = f"{state.audio_hash[:16]}-{idx}"
+                requests.append((custom_id, state.audio_hash, idx, language, body))
+            if cached_any:
+                self.store.save(state)
+
+        for start in range(0, len(requests), self.max_requests):
+            record_path = self._submit(requests[start : start + self.max_requests])
+            counts["submitted"] += min(self.max_requests, len(requests) - start)
+            self._finish(record_path, by_hash, counts)
+        metrics.event("llm_batch", **counts)
+        return counts
+
+    # ---------------------  helpers  ----------------------------------
+    def _submit(
+        self, requests: list[tuple[str, str, int, Language, dict[str, Any]]]
+    ) -> Path:
+        """Upload *requests* and create the batch; return its record path."""
+        client = self.gpt_utils.client
+        stamp = f"{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 10**9:09d}"
+        input_path = self.root / f"{stamp}.jsonl"
+        with open(input_path, "w", encoding="utf-8") as file:
+            for custom_id, *_, body in requests:
+                line = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/responses",
+                    "body": body,
+                }
+                file.write(json.dumps(line, ensure_ascii=False) + "\n")
+        with open(input_path, "rb") as file:
+            input_file = client.files.create(file=file, purpose="batch")
+
+        record_path = self.root / f"{stamp}.json"
+        record = {
+            "input_path": str(input_path),
+            "input_file_id": input_file.id,
+            "batch_id": None,
+            "requests": {
+                cid: [audio_hash, idx, language.value]
+                for cid, audio_hash, idx, language, _ in requests
+            },
+        }
+        self._save(record_path, record)
+        self._create(record_path, record)
+        return record_path
+
+    def _create(self, record_path: Path, record: dict[str, Any]) -> None:
+        batch = self.gpt_utils.client.batches.create(
+            input_file_id=record["input_file_id"],
+            endpoint="/v1/responses",
+            completion_window="24h",
+        )
+        record["batch_id"] = batch.id
+        self._save(record_path, record)
+        metrics.event(
+            "llm_batch_submitted", batch=batch.id, requests=len(record["requests"])
+        )
+
+    def _finish(
+        self,
+        record_path: Path,
+        by_hash: dict[str, RecordingState],
+        counts: dict[str, int],
+    ) -> None:
+        """Wait for the batch in *record_path* and apply its results."""
+        with open(record_path, "r", encoding="utf-8") as file:
+            record = json.load(file)
+        if record["batch_id"] is None:
+            # Interrupted between upload and creation.
+            self._create(record_path, record)
+
+        client = self.gpt_utils.client
+        while True:
+            batch = client.batches.retrieve(record["batch_id"])
+            if batch.status in _FINISHED:
+                break
+            time.sleep(self.poll_seconds)
+
+        lines: list[dict[str, Any]] = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                text = client.files.content(file_id).text
+                lines.extend(json.loads(line) for line in text.splitlines() if line)
+
+        done: set[str] = set()
+        touched: dict[str, RecordingState] = {}
+        for line in lines:
+            target = record["requests"].get(line.get("custom_id"))
+            if target is None:
+                continue
+            audio_hash, idx, language = target
+            # Results for recordings outside this run (e.g. archived since)
+            # are dropped rather than written back as a fresh checkpoint.
+            state = by_hash.get(audio_hash)
+            if state is None:
+                continue
+            if not state.chunks or idx > len(state.chunks) or idx in state.enriched:
+                continue
+            response = line.get("response") or {}
+            if line.get("error") or response.get("status_code") != 200:
+                continue
+            try:
+                state.enriched[idx] = self.gpt_utils.chunk_from_response(
+                    state.chunks[idx - 1], Language(language), response["body"]
+                )
+            except (ValueError, KeyError, TypeError):
+                continue
+            done.add(line["custom_id"])
+            touched[audio_hash] = state
+        for state in touched.values():
+            self.store.save(state)
+
+        failed = len(record["requests"]) - len(done)
+        counts["enriched"] += len(done)
+        counts["failed"] += failed
+        metrics.incr("llm_batch_failures", failed)
+        metrics.event(
+            "llm_batch_finished",
+            batch=record["batch_id"],
+            status=batch.status,
+            enriched=len(done),
+            failed=failed,
+        )
+        Path(record["input_path"]).unlink(missing_ok=True)
+        record_path.unlink()
+
+    @staticmethod
+    def _save(path: Path, record: dict[str, Any]) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(record, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class ResponseCache:
+    """On-disk, content-addressed cache of structured LLM responses.
+
+    Entries live in a single SQLite file and are keyed on a SHA-256 of
+    everything that influences the reply. Entries older than *max_age_days*
+    are dropped on read and the least recently used ones are evicted once
+    the stored payloads exceed *max_bytes* (``0`` disables either limit).
+    """
+
+    path: Path
+    max_bytes: int = 0
+    max_age_days: float = 0
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+
+    _conn: sqlite3.Connection = field(init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self.path = Path(self.path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Return a stable hash of the given request parts."""
+        blob = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._is_expired(row[1], now):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        blob = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    # ---------------------  helpers  ----------------------------------
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        if not self.max_age_days:
+            return False
+        return now - created_at > self.max_age_days * 86400
+
+    def _evict(self, now: float) -> None:
+        if self.max_age_days:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.max_age_days * 86400,),
+            )
+        if not self.max_bytes:
+            return
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
@@ -1,20 +1,65 @@
-import json
-from dataclasses import dataclass, field
+import queue
+import random
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any
-
-from openai import OpenAI
+from typing import TYPE_CHECKING, Any
 
 import config
 
+from .cache import ResponseCache
 from .chunk import Chunk
+from .json_repair import conform, loads_lenient
+from .metrics import metrics
+from .rate_limit import RateLimiter
 from .recordings import Language
+from .tokens import count_tokens, count_tokens_batch
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types.responses import ResponseTextConfigParam
+
+# Context window (prompt + reply) per model family; the longest matching
+# prefix of the model name wins.
+MODEL_CONTEXT_WINDOWS: dict[str, int] = {
+    "gpt-3.5-turbo": 16_385,
+    "gpt-4": 8_192,
+    "gpt-4-turbo": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4o-mini": 128_000,
+    "gpt-4.1": 1_047_576,
+    "o1": 200_000,
+    "o3": 200_000,
+    "o4-mini": 200_000,
+}
+DEFAULT_CONTEXT_WINDOW = 8_192
+# Per-message framing the API adds on top of the message contents.
+MESSAGE_OVERHEAD_TOKENS = 8
+# Reply fields that must not come back empty.
+_NON_EMPTY = ("title", "summary")
+
+
+def _default_cache() -> ResponseCache | None:
+    if not config.LLM_CACHE_ENABLED:
+        return None
+    return ResponseCache(
+        config.LLM_CACHE_PATH,
+        max_bytes=config.LLM_CACHE_MAX_MB * 1024 * 1024,
+        max_age_days=config.LLM_CACHE_MAX_AGE_DAYS,
+    )
 
 
 @dataclass
 class ChatGPTUtils:
     model: str
-    client: OpenAI = field(default=OpenAI(api_key=config.OPENAI_API_KEY), init=False)
+    cache: ResponseCache | None = field(default_factory=_default_cache, repr=False)
+    _client: "OpenAI | None" = field(default=None, init=False, repr=False)
+    _client_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
     prompts_path: Path = field(default=Path("prompts"), init=False)
 
     # ------------------------------------------------------------------
@@ -38,11 +83,32 @@ class ChatGPTUtils:
     )
 
     temperature: float = field(default=config.TEMPERATURE, init=False)
+    _budgets: dict[Language, int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    rate_limiter: RateLimiter = field(
+        default_factory=lambda: RateLimiter(config.OPENAI_RPM, config.OPENAI_TPM),
+        init=False,
+        repr=False,
+    )
 
     # ------------------------------------------------------------------
     #  Public API
     # ------------------------------------------------------------------
 
+    @property
+    def client(self) -> "OpenAI":
+        # Imported and created on first use so that runs with nothing to
+        # enrich never pay for loading the SDK.
+        with self._client_lock:
+            if self._client is None:
+                from openai import OpenAI
+
+                self._client = OpenAI(
+                    api_key=config.OPENAI_API_KEY, base_url=config.OPENAI_BASE_URL
+                )
+            return self._client
+
     def _get_structured_response(
         self,
         sys_prompt: str | None,
@@ -50,10 +116,102 @@ class ChatGPTUtils:
         use_web_search: bool = False,
     ) -> dict[str, Any]:
         """Wrapper around OpenAI Responses API returning structured JSON."""
-        from openai.types.beta.responses import (
-            ResponseTextConfigParam,
-        )  # type: ignore
+        request = self._build_request(sys_prompt, user_prompt)
+
+        cache_key = self._cache_key(sys_prompt, user_prompt)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            # Partial replies cached before they were rejected are refetched.
+            if cached is not None and all(cached.get(key) for key in _NON_EMPTY):
+                metrics.incr("llm_cache_hits")
+                return cached
+            metrics.incr("llm_cache_misses")
+
+        error: Exception | None = None
+        for attempt in range(config.LLM_MAX_RETRIES + 1):
+            if attempt:
+                metrics.incr("llm_retries", model=self.model)
+                delay = config.LLM_RETRY_BACKOFF * 2 ** (attempt - 1)
+                time.sleep(delay * random.uniform(0.5, 1.5))
+            try:
+                output_text = self._create_response(request)
+                parsed = self._parse_reply(output_text)
+            except Exception as exc:
+                if not self._is_retryable(exc):
+                    raise
+                error = exc
+                continue
+            if cache_key is not None:
+                self.cache.set(cache_key, parsed)
+            return parsed
+        raise ValueError(
+            f"No valid reply after {config.LLM_MAX_RETRIES + 1} attempts: {error}"
+        )
+
+    def _create_response(self, request: dict[str, Any]) -> str:
+        """Send one request and return the reply text."""
+        self.rate_limiter.acquire(self._estimate_tokens(request["input"]))
+        start = time.perf_counter()
+        response = self.client.responses.create(**request)
+        self._record_call(response, time.perf_counter() - start)
+
+        if response.error:
+            raise ValueError(f"API Error: {response.error.message}")
+        if not response.output_text:
+            raise ValueError("Empty reply")
+        return response.output_text
+
+    def _parse_reply(self, text: str, fix_up: bool = True) -> dict[str, Any]:
+        """Validate a reply against SCHEMA, repairing it where possible.
+
+        Local repairs come first; only a reply that cannot be parsed at all
+        is sent back with the JSON-error prompt, once, if *fix_up* is set.
+        Raises ``ValueError`` if no usable object comes out, including a
+        repaired one that lacks a key or has an empty title or summary, so
+        a partial result is retried instead of cached.
+        """
+        try:
+            value, repaired = loads_lenient(text)
+        except ValueError as exc:
+            if not fix_up:
+                raise
+            metrics.incr("llm_json_repairs", kind="llm")
+            content, prompt = self._create_content_and_prompt_json_error(
+                text, str(exc)
+            )
+            fixed = self._create_response(self._build_request(content, prompt))
+            return self._parse_reply(fixed, fix_up=False)
+
+        if not isinstance(value, dict):
+            raise ValueError("Reply is not a JSON object")
+        parsed, fixed_keys = conform(value, self.SCHEMA)
+        missing = [key for key in self.SCHEMA if key not in value]
+        missing += [key for key in _NON_EMPTY if key in value and not parsed[key]]
+        if missing:
+            raise ValueError(f"Reply lacks {', '.join(missing)}")
+        if repaired or fixed_keys:
+            metrics.incr("llm_json_repairs", kind="local")
+            metrics.event(
+                "llm_json_repair", syntax=repaired, keys=fixed_keys, model=self.model
+            )
+        return parsed
+
+    @staticmethod
+    def _is_retryable(exc: Exception) -> bool:
+        # Invalid replies and transient API failures; the SDK has already
+        # retried the latter at the HTTP level.
+        if isinstance(exc, ValueError):
+            return True
+        import openai
+
+        if isinstance(exc, openai.APIStatusError):
+            return exc.status_code == 429 or exc.status_code >= 500
+        return isinstance(exc, openai.APIConnectionError)
 
+    def _build_request(
+        self, sys_prompt: str | None, user_prompt: str | None
+    ) -> dict[str, Any]:
+        """Return the Responses API request body for the given prompts."""
         # Build messages list
         messages = []
         if sys_prompt:
@@ -65,7 +223,7 @@ class ChatGPTUtils:
                 "At least one of sys_prompt or user_prompt must be provided"
             )
 
-        text_config: ResponseTextConfigParam = {
+        text_config: "ResponseTextConfigParam" = {
             "format": {
                 "type": "json_schema",
                 "name": "structured_response",
@@ -73,25 +231,273 @@ class ChatGPTUtils:
                 "schema": self.SCHEMA,
             }
         }
+        return {
+            "input": messages,
+            "model": self.model,
+            "text": text_config,
+            "temperature": self.temperature,
+        }
 
-        response = self.client.responses.create(
-            input=messages,
+    def _cache_key(self, sys_prompt: str | None, user_prompt: str | None) -> str | None:
+        if self.cache is None:
+            return None
+        return ResponseCache.make_key(
             model=self.model,
-            text=text_config,
             temperature=self.temperature,
+            sys_prompt=sys_prompt,
+            user_prompt=user_prompt,
+            schema=self.SCHEMA,
         )
 
-        if response.error:
-            raise ValueError(f"API Error: {response.error.message}")
-
-        return json.loads(response.output_text) if response.output_text else {}
-
     def get_additional_info(self, chunk_str: str, language: Language) -> Chunk:
         content, prompt = self._create_content_and_prompt(chunk_str, language)
         parsed_res = self._get_structured_response(content, prompt)
         return self._create_chunk(chunk_str, parsed_res)
 
+    def cached_chunk(self, chunk_str: str, language: Language) -> Chunk | None:
+        """Return the enrichment of *chunk_str* if the cache already has it."""
+        content, prompt = self._create_content_and_prompt(chunk_str, language)
+        cache_key = self._cache_key(content, prompt)
+        parsed = self.cache.get(cache_key) if cache_key is not None else None
+        if not parsed or not all(parsed.get(key) for key in _NON_EMPTY):
+            return None
+        return self._create_chunk(chunk_str, parsed)
+
+    def chunk_request(self, chunk_str: str, language: Language) -> dict[str, Any]:
+        """Return the request body `get_additional_info` would send."""
+        content, prompt = self._create_content_and_prompt(chunk_str, language)
+        return self._build_request(content, prompt)
+
+    def chunk_from_response(
+        self, chunk_str: str, language: Language, body: dict[str, Any]
+    ) -> Chunk:
+        """Build a `Chunk` from a raw Responses API body, e.g. a batch result."""
+        if body.get("error"):
+            raise ValueError(f"API Error: {body['error'].get('message')}")
+        output_text = "".join(
+            part.get("text", "")
+            for item in body.get("output", [])
+            if item.get("type") == "message"
+            for part in item.get("content", [])
+            if part.get("type") == "output_text"
+        )
+        parsed = self._parse_reply(output_text)
+        chunk = self._create_chunk(chunk_str, parsed)
+
+        usage = body.get("usage") or {}
+        metrics.incr("llm_batch_results", model=self.model)
+        metrics.incr("llm_input_tokens", usage.get("input_tokens", 0), model=self.model)
+        metrics.incr(
+            "llm_output_tokens", usage.get("output_tokens", 0), model=self.model
+        )
+        content, prompt = self._create_content_and_prompt(chunk_str, language)
+        cache_key = self._cache_key(content, prompt)
+        if cache_key is not None:
+            self.cache.set(cache_key, parsed)
+        return chunk
+
+    def get_additional_info_many(
+        self,
+        chunks: Iterable[str],
+        language: Language,
+        max_concurrency: int = config.OPENAI_MAX_CONCURRENCY,
+    ) -> Iterator[Chunk]:
+        """Enrich *chunks* concurrently, yielding the results in input order.
+
+        At most *max_concurrency* requests are in flight at once and all of
+        them share this instance's rate limiter. *chunks* is consumed lazily
+        on a separate thread, so each result can be published as soon as it
+        is ready while later chunks are still being produced or running.
+        """
+        if max_concurrency <= 1:
+            for chunk_str in chunks:
+                yield self.get_additional_info(chunk_str, language)
+            return
+
+        # The input is read on a feeder thread, so a result is yielded as
+        # soon as it is next in order, not once the next input (e.g. the
+        # next streamed Whisper window) has arrived.
+        events: queue.Queue = queue.Queue()
+        slots = threading.Semaphore(max_concurrency)
+        closed = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+        def feed() -> None:
+            count = 0
+            try:
+                for chunk_str in chunks:
+                    slots.acquire()
+                    if closed.is_set():
+                        return
+                    future = executor.submit(
+                        self.get_additional_info, chunk_str, language
+                    )
+                    future.add_done_callback(
+                        lambda done, idx=count: events.put((idx, done))
+                    )
+                    count += 1
+            except BaseException as exc:
+                events.put((None, exc))
+                return
+            events.put((None, count))
+
+        threading.Thread(target=feed, name="enrich-feeder", daemon=True).start()
+        finished: dict[int, Future[Chunk]] = {}
+        total: int | None = None
+        next_idx = 0
+        try:
+            while total is None or next_idx < total:
+                idx, value = events.get()
+                if idx is None:
+                    if isinstance(value, BaseException):
+                        raise value
+                    total = value
+                    continue
+                finished[idx] = value
+                while next_idx in finished:
+                    future = finished.pop(next_idx)
+                    next_idx += 1
+                    slots.release()
+                    yield future.result()
+        finally:
+            closed.set()
+            # Wakes a feeder waiting for a slot, so it sees *closed*.
+            slots.release()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def summarize_lecture(
+        self,
+        chunks: list[Chunk],
+        language: Language,
+        fan_in: int = config.OVERVIEW_FAN_IN,
+        max_concurrency: int = config.OPENAI_MAX_CONCURRENCY,
+    ) -> Chunk:
+        """Reduce enriched *chunks* into one lecture-level overview.
+
+        Only the chunks' titles, summaries and main points are sent, never
+        the transcript. Consecutive chunks are merged in groups of up to
+        *fan_in* that fit one request, level by level until a single result
+        is left; the groups of a level run in parallel. The returned
+        `Chunk` has an empty transcript.
+        """
+        if not chunks:
+            raise ValueError("Cannot summarize a lecture without chunks")
+        level = list(chunks)
+        if len(level) == 1:
+            return self._create_chunk("", asdict(level[0]))
+
+        budget = self._overview_budget(language)
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            while len(level) > 1:
+                groups = self._group_for_overview(level, fan_in, budget)
+                level = list(
+                    executor.map(lambda g: self._reduce(g, language), groups)
+                )
+                metrics.incr("llm_overview_levels")
+        return level[0]
+
+    def _reduce(self, group: list[Chunk], language: Language) -> Chunk:
+        content, prompt = self._create_content_and_prompt_overview(group, language)
+        return self._create_chunk("", self._get_structured_response(content, prompt))
+
+    def _group_for_overview(
+        self, level: list[Chunk], fan_in: int, budget: int
+    ) -> list[list[Chunk]]:
+        """Split *level* into runs of consecutive chunks that fit one request."""
+        fan_in = max(2, fan_in)
+        sizes = count_tokens_batch([self._render_section(c) for c in level])
+        groups: list[list[Chunk]] = []
+        group_sizes: list[list[int]] = []
+        current: list[Chunk] = []
+        current_sizes: list[int] = []
+        for chunk, size in zip(level, sizes):
+            # Two parts per group at least, so every level shrinks.
+            overflow = sum(current_sizes) + size > budget and len(current) > 1
+            if len(current) >= fan_in or overflow:
+                groups.append(current)
+                group_sizes.append(current_sizes)
+                current, current_sizes = [], []
+            current.append(chunk)
+            current_sizes.append(size)
+        if len(current) == 1 and groups:
+            # A lone last part joins the previous group only if that still
+            # fits; otherwise it takes that group's last part as a partner.
+            last, last_sizes = groups[-1], group_sizes[-1]
+            if len(last) < fan_in and sum(last_sizes) + current_sizes[0] <= budget:
+                last.append(current.pop())
+            elif len(last) > 2:
+                current.insert(0, last.pop())
+        if current:
+            groups.append(current)
+        return groups
+
+    def _overview_budget(self, language: Language) -> int:
+        content, prompt = self._create_content_and_prompt_overview([], language)
+        prompt_tokens = self._estimate_tokens(
+            [{"content": content}, {"content": prompt}]
+        )
+        return max(1, self.context_window() - prompt_tokens)
+
+    @staticmethod
+    def _render_section(chunk: Chunk) -> str:
+        points = "\n".join(f"- {point}" for point in chunk.main_points)
+        return f"## {chunk.title}\n{chunk.summary}\nMain points:\n{points}\n"
+
+    def _record_call(self, response: Any, latency: float) -> None:
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        metrics.incr("llm_requests", model=self.model)
+        metrics.incr("llm_input_tokens", input_tokens, model=self.model)
+        metrics.incr("llm_output_tokens", output_tokens, model=self.model)
+        metrics.observe("llm_latency_seconds", latency, model=self.model)
+        metrics.event(
+            "llm_call",
+            model=self.model,
+            latency_s=round(latency, 4),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+        )
+
+    def _estimate_tokens(self, messages: list[dict[str, str]]) -> int:
+        # Prompt tokens plus the expected reply size.
+        prompt_tokens = sum(
+            count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+            for message in messages
+        )
+        return prompt_tokens + config.OUTPUT_TOKENS
+
+    def context_window(self) -> int:
+        matches = [
+            name for name in MODEL_CONTEXT_WINDOWS if self.model.startswith(name)
+        ]
+        if not matches:
+            return DEFAULT_CONTEXT_WINDOW
+        return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+
+    def chunk_token_budget(self, language: Language) -> int:
+        """Return how many transcript tokens fit in one enrichment request.
+
+        The budget is the model's context window minus the rendered prompt
+        templates and the expected reply, capped by ``CHUNK_MAX_TOKENS``.
+        """
+        if language not in self._budgets:
+            content, prompt = self._create_content_and_prompt("", language)
+            prompt_tokens = self._estimate_tokens(
+                [{"content": content}, {"content": prompt}]
+            )
+            budget = self.context_window() - prompt_tokens
+            if config.CHUNK_MAX_TOKENS:
+                budget = min(budget, config.CHUNK_MAX_TOKENS)
+            if budget <= 0:
+                raise ValueError(
+                    f"The prompts leave no room for the transcript with {self.model}"
+                )
+            self._budgets[language] = budget
+        return self._budgets[language]
+
     def _create_chunk(self, transcription: str, parsed_res: dict) -> Chunk:
+        parsed_res, _ = conform(parsed_res, self.SCHEMA)
         return Chunk(
             parsed_res["title"],
             transcription,
@@ -108,8 +514,18 @@ class ChatGPTUtils:
         content = self.read_prompt_from_file("content_english.txt")
 
         prompt = prompt_template.format(
-            transcription=transcription, output_language=config.output_language()
+            transcription=transcription, output_language=language.full_name
+        )
+        return content, prompt
+
+    def _create_content_and_prompt_overview(
+        self, chunks: list[Chunk], language: Language
+    ) -> tuple[str, str]:
+        sections = "\n".join(self._render_section(chunk) for chunk in chunks)
+        prompt = self.read_prompt_from_file("prompt_overview.txt").format(
+            sections=sections, output_language=language.full_name
         )
+        content = self.read_prompt_from_file("content_english.txt")
         return content, prompt
 
     def _create_content_and_prompt_json_error(
@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .chunk import Chunk
+
+
+@dataclass
+class RecordingState:
+    """Progress of one recording through the pipeline.
+
+    Keyed by the SHA-256 of the audio content so that a renamed or re-copied
+    file still resumes from the same point. Chunk indices are 1-based, as on
+    the Notion page. With streaming transcription *chunks* grows while
+    *transcript* is still ``None``; *chunk_ends* then records where in the
+    audio each chunk stops so the stream can resume after the last one.
+    *overview* is the lecture-level summary reduced from the enriched chunks.
+    *duration* (whole seconds) is kept so a resumed recording is not probed.
+    """
+
+    audio_hash: str
+    duration: int | None = None
+    transcript: str | None = None
+    chunks: list[str] | None = None
+    chunk_ends: list[float] = field(default_factory=list)
+    enriched: dict[int, Chunk] = field(default_factory=dict)
+    page_id: str | None = None
+    last_published: int = 0
+    overview: Chunk | None = None
+    overview_published: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "audio_hash": self.audio_hash,
+            "duration": self.duration,
+            "transcript": self.transcript,
+            "chunks": list(self.chunks) if self.chunks is not None else None,
+            "chunk_ends": list(self.chunk_ends),
+            # Copied first: another thread may be adding results meanwhile.
+            "enriched": {
+                str(idx): asdict(c) for idx, c in list(self.enriched.items())
+            },
+            "page_id": self.page_id,
+            "last_published": self.last_published,
+            "overview": asdict(self.overview) if self.overview else None,
+            "overview_published": self.overview_published,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RecordingState":
+        return cls(
+            audio_hash=data["audio_hash"],
+            duration=data.get("duration"),
+            transcript=data.get("transcript"),
+            chunks=data.get("chunks"),
+            chunk_ends=data.get("chunk_ends", []),
+            enriched={
+                int(idx): Chunk(**chunk)
+                for idx, chunk in data.get("enriched", {}).items()
+            },
+            page_id=data.get("page_id"),
+            last_published=data.get("last_published", 0),
+            overview=Chunk(**data["overview"]) if data.get("overview") else None,
+            overview_published=data.get("overview_published", False),
+        )
+
+
+@dataclass
+class CheckpointStore:
+    """Directory of JSON state records, one per recording.
+
+    Safe to share between threads; saves of a record are serialized.
+    """
+
+    root: Path
+
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self.root = Path(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def load(self, audio_hash: str) -> RecordingState:
+        """Return the saved state for *audio_hash* or a fresh one."""
+        path = self._path(audio_hash)
+        if not path.exists():
+            return RecordingState(audio_hash)
+        with open(path, "r", encoding="utf-8") as file:
+            return RecordingState.from_dict(json.load(file))
+
+    def save(self, state: RecordingState) -> None:
+        # Write to a temporary file first so a crash never leaves a torn record.
+        path = self._path(state.audio_hash)
+        tmp_path = path.with_suffix(".tmp")
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(state.to_dict(), file, ensure_ascii=False)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+
+    def discard(self, audio_hash: str) -> None:
+        self._path(audio_hash).unlink(missing_ok=True)
+
+    def _path(self, audio_hash: str) -> Path:
+        return self.root / f"{audio_hash}.json"
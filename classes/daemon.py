@@ -0,0 +1,172 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import config
+
+from .discovery import DONE, FAILED, DiscoveryIndex
+from .metrics import metrics
+from .pipeline import Stage
+from .processor import RecordingJob, RecordingProcessor
+from .utils import order_by_language
+
+_STOP = object()
+
+
+@dataclass
+class RecordingDaemon:
+    """Long-running watcher that feeds new recordings through the pipeline.
+
+    The transcriber is loaded once and kept for the lifetime of the
+    process. `DiscoveryIndex` is polled every *poll_seconds*; a file is
+    only picked up once its size and mtime stayed the same for
+    *settle_seconds*, so recordings still being copied are left alone.
+    Failed recordings are retried after *retry_seconds*. The state is
+    written to *status_path* as JSON after every poll and job.
+
+    `stop` (e.g. from a signal handler) lets the chunks in flight finish,
+    then returns from `run`; unfinished recordings resume on the next start.
+    """
+
+    processor: RecordingProcessor
+    index: DiscoveryIndex
+    poll_seconds: float = config.WATCH_POLL_SECONDS
+    settle_seconds: float = config.WATCH_SETTLE_SECONDS
+    retry_seconds: float = config.WATCH_RETRY_SECONDS
+    status_path: Path | None = config.WATCH_STATUS_PATH
+
+    _inbox: queue.Queue = field(default_factory=queue.Queue, init=False, repr=False)
+    _stopping: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+    # path -> (size, mtime_ns, first time that signature was seen)
+    _sizes: dict[Path, tuple[int, int, float]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _active: set[Path] = field(default_factory=set, init=False, repr=False)
+    _failed_at: dict[Path, float] = field(default_factory=dict, init=False, repr=False)
+    _counts: dict[str, int] = field(
+        default_factory=lambda: {"processed": 0, "failed": 0},
+        init=False,
+        repr=False,
+    )
+    _last_error: str | None = field(default=None, init=False, repr=False)
+    _started_at: float = field(default_factory=time.time, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    # ------------------------------------------------------------------
+    #  Public API
+    # ------------------------------------------------------------------
+    def run(self) -> None:
+        """Watch and process until `stop` is called."""
+        load = getattr(self.processor.model, "load", None)
+        if load is not None:
+            self._write_status("loading")
+            load()
+
+        pipeline = self.processor.build_pipeline(
+            on_error=self._on_error, on_archived=self._on_archived
+        )
+        worker = threading.Thread(
+            target=pipeline.run, args=(self._jobs(),), name="daemon-pipeline"
+        )
+        worker.start()
+        try:
+            while not self._stopping.is_set():
+                self._poll()
+                self._write_status("running")
+                self._stopping.wait(self.poll_seconds)
+        finally:
+            self._write_status("stopping")
+            self.processor.stop.set()
+            self._inbox.put(_STOP)
+            worker.join()
+            self._write_status("stopped")
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    # ---------------------  helpers  ----------------------------------
+    def _poll(self) -> None:
+        now = time.monotonic()
+        scanned = order_by_language(self.index.scan())
+        pending = set(scanned)
+        for path in scanned:
+            with self._lock:
+                if path in self._active:
+                    continue
+            failed_at = self._failed_at.get(path)
+            if failed_at is not None and now - failed_at < self.retry_seconds:
+                continue
+            if self._is_settled(path, now):
+                with self._lock:
+                    self._active.add(path)
+                self._sizes.pop(path, None)
+                self._inbox.put(RecordingJob(path))
+        # Forget files that went away while settling.
+        for path in set(self._sizes) - pending:
+            del self._sizes[path]
+
+    def _is_settled(self, path: Path, now: float) -> bool:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_size, stat.st_mtime_ns)
+        seen = self._sizes.get(path)
+        if seen is None or seen[:2] != signature:
+            self._sizes[path] = (*signature, now)
+            return False
+        return now - seen[2] >= self.settle_seconds
+
+    def _jobs(self) -> Iterator[RecordingJob]:
+        while (job := self._inbox.get()) is not _STOP:
+            yield job
+
+    def _on_archived(self, job: RecordingJob) -> None:
+        self.index.mark(job.path, DONE, job.state.audio_hash)
+        with self._lock:
+            self._active.discard(job.path)
+            self._counts["processed"] += 1
+        self._failed_at.pop(job.path, None)
+        self._write_status("running")
+
+    def _on_error(self, job: RecordingJob, stage: Stage, exc: Exception) -> None:
+        self.index.mark(job.path, FAILED)
+        with self._lock:
+            self._active.discard(job.path)
+            self._counts["failed"] += 1
+            self._last_error = f"{job.path}: {stage.name} failed: {exc}"
+        self._failed_at[job.path] = time.monotonic()
+        metrics.event("daemon_error", recording=job.path.name, stage=stage.name)
+        print(self._last_error)
+
+    def _write_status(self, state: str) -> None:
+        if self.status_path is None:
+            return
+        with self._lock:
+            status: dict[str, Any] = {
+                "state": state,
+                "pid": os.getpid(),
+                "started_at": round(self._started_at, 3),
+                "updated_at": round(time.time(), 3),
+                "in_progress": sorted(str(path) for path in self._active),
+                "queued": self._inbox.qsize(),
+                "settling": len(self._sizes),
+                **self._counts,
+                "last_error": self._last_error,
+            }
+            self.status_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.status_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(status, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self.status_path)
+        if config.METRICS_PROMETHEUS_PATH is not None:
+            metrics.write_prometheus(config.METRICS_PROMETHEUS_PATH)
@@ -0,0 +1,187 @@
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+AUDIO_EXTENSIONS = frozenset({".mp3", ".m4a"})
+# Finished recordings are moved into a folder of this name next to them.
+ARCHIVE_FOLDER = "processed"
+# Directory mtimes this close to the scan may still change within the
+# filesystem's timestamp resolution, so such directories are listed again.
+_MTIME_SETTLE_NS = 2_000_000_000
+
+PENDING = "pending"
+FAILED = "failed"
+DONE = "done"
+
+
+@dataclass
+class DiscoveryIndex:
+    """Persistent index of the recordings found under *root*.
+
+    Every audio file is stored with its size, mtime, status and, once
+    processed, the SHA-256 of its content. A scan only lists directories
+    whose mtime changed since the previous one (adding, removing or
+    renaming an entry updates it) plus the files still waiting to be
+    processed, so a run over an unchanged tree costs one ``stat`` per
+    directory. Archive folders are never entered.
+    """
+
+    path: Path
+    root: Path
+
+    _conn: sqlite3.Connection = field(init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self.path = Path(self.path)
+        self.root = Path(self.root)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS dirs ("
+            " path TEXT PRIMARY KEY,"
+            " parent TEXT,"
+            " mtime_ns INTEGER);"
+            "CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);"
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " dir TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " hash TEXT,"
+            " status TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS files_status ON files (status);"
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    #  Public API
+    # ------------------------------------------------------------------
+    def scan(self) -> list[Path]:
+        """Update the index and return the recordings still to process.
+
+        New files and files whose size or mtime changed are (re)marked
+        pending; failed recordings are returned again so they resume.
+        """
+        with self._lock:
+            now_ns = time.time_ns()
+            stack = [self.root]
+            while stack:
+                directory = stack.pop()
+                stack.extend(self._scan_dir(directory, now_ns))
+            self._refresh_pending()
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT path FROM files WHERE status IN (?, ?) ORDER BY path",
+                (PENDING, FAILED),
+            ).fetchall()
+        return [Path(path) for (path,) in rows]
+
+    def mark(self, path: Path, status: str, audio_hash: str | None = None) -> None:
+        """Record the outcome for *path*; *audio_hash* is kept if given."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET status = ?, hash = COALESCE(?, hash)"
+                " WHERE path = ?",
+                (status, audio_hash, str(path)),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------------------  helpers  ----------------------------------
+    def _scan_dir(self, directory: Path, now_ns: int) -> list[Path]:
+        """Sync one directory and return the subdirectories to visit."""
+        key = str(directory)
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._forget_dir(key)
+            return []
+        row = self._conn.execute(
+            "SELECT mtime_ns FROM dirs WHERE path = ?", (key,)
+        ).fetchone()
+        if row is not None and row[0] == mtime_ns:
+            children = self._conn.execute(
+                "SELECT path FROM dirs WHERE parent = ?", (key,)
+            ).fetchall()
+            return [Path(path) for (path,) in children]
+
+        subdirs: list[Path] = []
+        files: dict[str, os.stat_result] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != ARCHIVE_FOLDER:
+                        subdirs.append(Path(entry.path))
+                elif Path(entry.name).suffix in AUDIO_EXTENSIONS:
+                    files[entry.path] = entry.stat()
+
+        for path, stat in files.items():
+            self._upsert_file(path, key, stat)
+        known = self._conn.execute(
+            "SELECT path, status FROM files WHERE dir = ?", (key,)
+        ).fetchall()
+        # Done entries outlive their file (it was archived) to keep the hash.
+        self._conn.executemany(
+            "DELETE FROM files WHERE path = ?",
+            [(p,) for p, status in known if p not in files and status != DONE],
+        )
+        for (child,) in self._conn.execute(
+            "SELECT path FROM dirs WHERE parent = ?", (key,)
+        ).fetchall():
+            if Path(child) not in subdirs:
+                self._forget_dir(child)
+
+        # A directory touched within the timestamp resolution is listed
+        # again next time, since a later change may not move its mtime.
+        settled = now_ns - mtime_ns > _MTIME_SETTLE_NS
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)",
+            (key, self._parent_key(directory), mtime_ns if settled else None),
+        )
+        return subdirs
+
+    def _upsert_file(self, path: str, directory: str, stat: os.stat_result) -> None:
+        row = self._conn.execute(
+            "SELECT size, mtime_ns FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is not None and row == (stat.st_size, stat.st_mtime_ns):
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, NULL, ?)",
+            (path, directory, stat.st_size, stat.st_mtime_ns, PENDING),
+        )
+
+    def _refresh_pending(self) -> None:
+        """Re-stat files not yet processed; they may still be growing."""
+        rows = self._conn.execute(
+            "SELECT path, dir FROM files WHERE status IN (?, ?)", (PENDING, FAILED)
+        ).fetchall()
+        for path, directory in rows:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                continue
+            self._upsert_file(path, directory, stat)
+
+    def _forget_dir(self, key: str) -> None:
+        for (child,) in self._conn.execute(
+            "SELECT path FROM dirs WHERE parent = ?", (key,)
+        ).fetchall():
+            self._forget_dir(child)
+        self._conn.execute("DELETE FROM dirs WHERE path = ?", (key,))
+        self._conn.execute(
+            "DELETE FROM files WHERE dir = ? AND status != ?", (key, DONE)
+        )
+
+    def _parent_key(self, directory: Path) -> str | None:
+        return None if directory == self.root else str(directory.parent)
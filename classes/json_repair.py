@@ -0,0 +1,126 @@
+import json
+import re
+from typing import Any
+
+# Code fences some models wrap JSON replies in.
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+# How many trailing values a truncated reply may lose before giving up.
+_MAX_CUTS = 20
+
+
+def loads_lenient(text: str) -> tuple[Any, bool]:
+    """Parse *text* as JSON, repairing common defects of model replies.
+
+    Handles code fences, text around the outermost object, trailing commas
+    and replies cut off mid-way (open strings, arrays and objects are
+    closed, dropping the incomplete last value if needed). Returns the value
+    and whether a repair was needed; raises ``ValueError`` if none worked.
+    """
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError as exc:
+        error = exc
+
+    candidate = _FENCE.sub("", text)
+    start = candidate.find("{")
+    if start != -1:
+        candidate = candidate[start:]
+    for _ in range(_MAX_CUTS):
+        closed, cut = _close(candidate)
+        try:
+            return json.loads(closed), True
+        except json.JSONDecodeError:
+            if cut is None:
+                break
+            candidate = candidate[:cut]
+    raise ValueError(f"Unrepairable JSON: {error}")
+
+
+def conform(
+    value: Any, properties: dict[str, dict[str, Any]]
+) -> tuple[dict[str, Any], list[str]]:
+    """Coerce *value* to an object with exactly the keys of *properties*.
+
+    Missing keys get an empty value of their declared type, strings stand
+    in for one-item arrays and vice versa, and unknown keys are dropped.
+    Returns the object and the list of keys that had to be fixed.
+    """
+    source = value if isinstance(value, dict) else {}
+    result: dict[str, Any] = {}
+    fixed: list[str] = []
+    for key, spec in properties.items():
+        item = source.get(key)
+        if spec.get("type") == "array":
+            if isinstance(item, list):
+                coerced = [x if isinstance(x, str) else json.dumps(x) for x in item]
+            elif item is None:
+                coerced = []
+            else:
+                coerced = [str(item)]
+        elif isinstance(item, str):
+            coerced = item
+        elif isinstance(item, list):
+            coerced = "\n".join(str(x) for x in item)
+        else:
+            coerced = "" if item is None else str(item)
+        if coerced != item:
+            fixed.append(key)
+        result[key] = coerced
+    return result, fixed
+
+
+# ---------------------  helpers  ----------------------------------
+def _close(text: str) -> tuple[str, int | None]:
+    """Drop trailing commas and close whatever *text* left open.
+
+    Also returns the position of the last comma outside a string, where the
+    text can be cut if its final value is too incomplete to close.
+    """
+    out: list[str] = []
+    stack: list[str] = []
+    in_string = escaped = False
+    last_comma = None
+    for pos, char in enumerate(text):
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            _strip_trailing_comma(out)
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                break
+            continue
+        elif char == ",":
+            last_comma = pos
+        out.append(char)
+
+    if escaped:
+        out.pop()
+    if in_string:
+        out.append('"')
+    _strip_trailing_comma(out)
+    tail = "".join(out).rstrip()
+    if tail.endswith(":"):
+        tail += " null"
+    return tail + "".join(reversed(stack)), last_comma
+
+
+def _strip_trailing_comma(out: list[str]) -> None:
+    idx = len(out) - 1
+    while idx >= 0 and out[idx].isspace():
+        idx -= 1
+    if idx >= 0 and out[idx] == ",":
+        del out[idx]
@@ -0,0 +1,187 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TextIO
+
+
+@dataclass
+class Metrics:
+    """Process-wide collector of stage timings, API calls and counters.
+
+    Every event is appended to a JSON-lines file as it happens (once `open`
+    has been called), while counters and summaries are aggregated in memory
+    for the Prometheus text export. Label sets stay small on purpose: the
+    per-recording detail lives in the JSON lines only.
+    """
+
+    run_id: str = field(
+        default_factory=lambda: f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    )
+    profile_dir: Path | None = None
+
+    _sink: TextIO | None = field(default=None, init=False, repr=False)
+    _counters: dict[tuple, float] = field(
+        default_factory=lambda: defaultdict(float), init=False, repr=False
+    )
+    _summaries: dict[tuple, list[float]] = field(
+        default_factory=lambda: defaultdict(lambda: [0.0, 0]),
+        init=False,
+        repr=False,
+    )
+    _lock: threading.RLock = field(
+        default_factory=threading.RLock, init=False, repr=False
+    )
+
+    # ------------------------------------------------------------------
+    #  Recording
+    # ------------------------------------------------------------------
+    def open(self, jsonl_path: Path) -> None:
+        """Start appending events to *jsonl_path*."""
+        jsonl_path = Path(jsonl_path)
+        jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._sink = open(jsonl_path, "a", encoding="utf-8", buffering=1)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sink is not None:
+                self._sink.close()
+                self._sink = None
+
+    def event(self, kind: str, **fields: Any) -> None:
+        """Write one event to the JSON-lines sink."""
+        line = {"ts": round(time.time(), 3), "run": self.run_id, "kind": kind}
+        line.update(fields)
+        with self._lock:
+            if self._sink is not None:
+                self._sink.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def incr(self, name: str, value: float = 1, **labels: str) -> None:
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            summary = self._summaries[(name, tuple(sorted(labels.items())))]
+            summary[0] += value
+            summary[1] += 1
+
+    @contextmanager
+    def stage(self, stage: str, recording: str = "") -> Iterator[dict[str, Any]]:
+        """Time a block as *stage* of *recording*.
+
+        Wall time and the CPU time of the current thread are recorded. The
+        yielded dict can be filled with extra fields; ``audio_seconds`` also
+        yields an audio-seconds-per-second throughput figure.
+        """
+        extra: dict[str, Any] = {}
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        ok = False
+        try:
+            yield extra
+            ok = True
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            if "audio_seconds" in extra and wall > 0:
+                extra["audio_seconds_per_second"] = round(
+                    extra["audio_seconds"] / wall, 3
+                )
+                self.observe("audio_seconds", extra["audio_seconds"], stage=stage)
+            self.observe("stage_wall_seconds", wall, stage=stage)
+            self.observe("stage_cpu_seconds", cpu, stage=stage)
+            if not ok:
+                self.incr("stage_failures", stage=stage)
+            self.event(
+                "stage",
+                stage=stage,
+                recording=recording,
+                ok=ok,
+                wall_s=round(wall, 4),
+                cpu_s=round(cpu, 4),
+                **extra,
+            )
+
+    # ------------------------------------------------------------------
+    #  Profiling
+    # ------------------------------------------------------------------
+    @contextmanager
+    def profile_thread(self, name: str) -> Iterator[None]:
+        """Profile the current thread into *profile_dir* when enabled."""
+        if self.profile_dir is None:
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            thread = threading.current_thread().name
+            dump = self.profile_dir / f"{self.run_id}.{name}-{thread}.prof"
+            profiler.dump_stats(dump)
+
+    def merge_profiles(self, top: int = 30) -> Path | None:
+        """Merge the per-thread dumps into one file and print the hot paths."""
+        if self.profile_dir is None:
+            return None
+        dumps = sorted(self.profile_dir.glob(f"{self.run_id}.*.prof"))
+        if not dumps:
+            return None
+        stats = pstats.Stats(*map(str, dumps))
+        merged = self.profile_dir / f"profile-{self.run_id}.prof"
+        stats.dump_stats(merged)
+        for dump in dumps:
+            dump.unlink()
+        stats.sort_stats("cumulative").print_stats(top)
+        return merged
+
+    # ------------------------------------------------------------------
+    #  Export
+    # ------------------------------------------------------------------
+    def to_prometheus(self, prefix: str = "lecture_summarizer") -> str:
+        """Render counters and summaries in the Prometheus text format."""
+        lines: list[str] = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            summaries = sorted(self._summaries.items())
+        for (name, labels), value in counters:
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"{metric}{_labels(labels)} {value:g}")
+        for (name, labels), (total, count) in summaries:
+            metric = f"{prefix}_{name}"
+            lines.append(f"{metric}_sum{_labels(labels)} {total:.6g}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(self.to_prometheus(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def _labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels)
+    return "{" + inner + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Shared by every module of the pipeline.
+metrics = Metrics()
@@ -1,18 +1,44 @@
 import os
-import re
 from dataclasses import dataclass, field
 from typing import Dict, Tuple
 
-import requests
-
 from .chunk import Chunk
+from .metrics import metrics
+from .notion_blocks import (
+    heading_block,
+    list_blocks,
+    pack_requests,
+    paragraph_blocks,
+)
+from .notion_client import NotionAPIError, NotionClient, get_notion_client
+from .notion_manifest import (
+    ManifestStore,
+    PageManifest,
+    PageSection,
+    blocks_hash,
+    section_order,
+)
 from .recordings import Recording
 
+# Statuses of a page or block that was deleted (or archived) in Notion.
+_GONE = {400, 404}
+# Page property holding the audio hash of the recording a page belongs to.
+RECORDING_ID_PROPERTY = "Recording ID"
+
 
 @dataclass
 class NotionPage:
     recording: Recording
+    # Reuse an existing page (e.g. when resuming) instead of creating one.
+    page_id: str | None = None
+    # Shared by all pages unless a dedicated client is passed in.
+    client: NotionClient | None = field(default=None, repr=False)
+    # With both set, the page is upserted: found again by *recording_id*
+    # and only the sections whose content changed are rewritten.
+    recording_id: str | None = None
+    manifests: ManifestStore | None = field(default=None, repr=False)
     DB_ID: str = field(init=False)
+    _manifest: PageManifest | None = field(default=None, init=False, repr=False)
 
     # Define the expected database schema once so it can be reused by the
     # verification & fix helpers.
@@ -22,37 +48,33 @@ class NotionPage:
             "Duration (seconds)": "number",
             "Subject": "select",
             "Who": "select",
+            RECORDING_ID_PROPERTY: "rich_text",
         },
         init=False,
         repr=False,
     )
 
     def __post_init__(self):
-        # Load database ID and API key from environment
+        # Load database ID from environment; the API key lives in the client
         self.DB_ID = os.environ.get("NOTION_DB_ID")
-        notion_api_key = os.environ.get("NOTION_API_KEY")
+        if self.client is None:
+            self.client = get_notion_client()
 
-        if not notion_api_key:
-            raise EnvironmentError(
-                "NOTION_API_KEY is not set. Please configure it in your .env file."
-            )
         if not self.DB_ID:
             raise EnvironmentError(
                 "NOTION_DB_ID is not set. Please configure it in your .env file."
             )
 
-        self.headers = {
-            "Authorization": f"Bearer {notion_api_key}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-06-28",
-        }
-        self.page_id = self._create_page("https://api.notion.com/v1/pages")
-        self.url_update = f"https://api.notion.com/v1/blocks/{self.page_id}/children"
+        if self.recording_id is not None and self.manifests is not None:
+            self._manifest = self.manifests.load(self.recording_id)
+            self.page_id = self._resolve_page()
+        elif self.page_id is None:
+            self.page_id = self._create_page()
+        self.url_update = f"blocks/{self.page_id}/children"
 
-    def _create_page(self, url: str) -> None:
+    def _create_page(self) -> str:
         payload = self._create_initial_payload()
-        response = requests.post(url, json=payload, headers=self.headers)
-        return response.json()["id"]
+        return self.client.request("POST", "pages", json=payload)["id"]
 
     def _create_initial_payload(self) -> dict:
         payload = {
@@ -70,82 +92,272 @@ class NotionPage:
             "icon": {"type": "emoji", "emoji": "🤖"},
             "children": [{"table_of_contents": {"color": "blue"}}],
         }
+        if self._manifest is not None:
+            payload["properties"][RECORDING_ID_PROPERTY] = {
+                "rich_text": [{"text": {"content": self.recording_id}}]
+            }
         return payload
 
     def update_page(self, chunk: Chunk, chunk_idx: int) -> None:
-        payload = self._create_chunk_payload(chunk, chunk_idx)
-        response = requests.patch(self.url_update, json=payload, headers=self.headers)
-        if response.status_code != 200:
+        self.publish_chunks([(chunk_idx, chunk)])
+
+    def publish_chunks(self, chunks: list[tuple[int, Chunk]]) -> None:
+        """Publish consecutive (index, chunk) pairs in as few requests as fit."""
+        sections = [
+            (str(idx), self._create_chunk_payload(chunk, idx)["children"])
+            for idx, chunk in chunks
+        ]
+        if self._manifest is not None:
+            self._upsert_sections(sections)
             return
+        self._append([block for _, blocks in sections for block in blocks])
 
-    def _create_chunk_payload(self, chunk: Chunk, chunk_idx: int) -> dict:
-        blocks = []
-        blocks.append(
-            self._contruct_header_obj("heading_1", f"{chunk_idx}. {chunk.title}")
-        )
-        transcription_paragraphs = self._split_text_into_paragraphs(chunk.transcript)
-        blocks.extend(self._construct_text_obj(transcription_paragraphs))
-        blocks.append(self._contruct_header_obj("heading_2", "Summary"))
-        summary_paragraphs = self._split_text_into_paragraphs(chunk.summary)
-        blocks.extend(self._construct_text_obj(summary_paragraphs))
-        blocks.append(self._contruct_header_obj("heading_2", "Main points"))
-        blocks.extend(self._construct_list_obj(chunk.main_points))
-        blocks.append(self._contruct_header_obj("heading_2", "Follow ups"))
-        blocks.extend(self._construct_list_obj(chunk.follow_up))
-        payload = {"children": blocks}
-        return payload
+    def publish_overview(self, overview: Chunk) -> None:
+        """Insert the lecture overview right after the table of contents."""
+        blocks = self._create_overview_payload(overview)["children"]
+        if self._manifest is not None:
+            self._upsert_sections([("overview", blocks)])
+            return
+        self._append(blocks, after=self._find_table_of_contents())
+
+    def remove_chunks_after(self, chunk_count: int) -> None:
+        """Delete chunk sections left over from a longer earlier version."""
+        if self._manifest is None:
+            return
+        stale = [
+            key
+            for key in self._manifest.sections
+            if key != "overview" and int(key) > chunk_count
+        ]
+        for key in stale:
+            self._delete_blocks(self._manifest.sections.pop(key).blocks)
+            self.manifests.save(self._manifest)
+
+    def _find_table_of_contents(self) -> str | None:
+        # The table of contents is the first block of every page we create.
+        children = self.client.request("GET", f"{self.url_update}?page_size=10")
+        for block in children.get("results", []):
+            if block.get("type") == "table_of_contents":
+                return block["id"]
+        return None
+
+    # ---------------------  upsert  -----------------------------------
+    def _resolve_page(self) -> str:
+        """Return the recording's page, reusing it whenever it still exists.
+
+        A page id passed in together with a manifest that names the same page
+        is trusted as is. Otherwise the manifest's page is confirmed with one
+        request (which also refreshes its properties), then the database is
+        searched for a page stamped with the same recording id; a page found
+        that way has its old content cleared. Pages are never matched by
+        title, so another lecture of the same name is left alone. Only then
+        is a new page created.
+        """
+        manifest = self._manifest
+        self._ensure_recording_id_property()
+        if self.page_id is not None and self.page_id == manifest.page_id:
+            return self.page_id
+
+        page_id = manifest.page_id or self.page_id
+        if page_id is not None and self._refresh_page(page_id):
+            if page_id != manifest.page_id:
+                self._adopt_page(page_id)
+            return page_id
+
+        page_id = self._query_page()
+        if page_id is not None:
+            self._adopt_page(page_id)
+            metrics.incr("notion_pages_adopted")
+            return page_id
+
+        page_id = self._create_page()
+        manifest.page_id, manifest.toc_id = page_id, None
+        manifest.sections.clear()
+        self.manifests.save(manifest)
+        return page_id
+
+    def _refresh_page(self, page_id: str) -> bool:
+        """Update the page's properties; False if it no longer exists."""
+        payload = {"properties": self._create_initial_payload()["properties"]}
+        try:
+            page = self.client.request("PATCH", f"pages/{page_id}", json=payload)
+        except NotionAPIError as exc:
+            if exc.status in _GONE:
+                return False
+            raise
+        return not page.get("archived", False)
 
-    def _split_text_into_paragraphs(self, text: str) -> list[str]:
-        # Split the text into sentences
-        sentences = re.split(r"(?<=[.!?])\s+", text)
-
-        # Split any sentence longer than 600 characters into smaller parts
-        for i, sentence in enumerate(sentences):
-            if len(sentence) > 600:
-                parts = re.split(
-                    r"(?<=[,])\s+", sentence
-                )  # First attempt to split by commas
-                if (
-                    len(" ".join(parts)) > 600
-                ):  # If it's still too long, split on capital letters
-                    parts = re.split(r"(?<=[a-z])\s+(?=[A-Z])", sentence)
-                if (
-                    len(" ".join(parts)) > 600
-                ):  # If it's still too long, split on spaces
-                    parts = sentence.split(" ")
-
-                sentences[i : i + 1] = parts
-
-        chunks = []
-        chunk = sentences[0]
-        for sentence in sentences[1:]:
-            if (
-                len(chunk) + len(sentence) + 1 > 600
-            ):  # +1 for the space between sentences
-                chunks.append(chunk)
-                chunk = sentence
+    def _ensure_recording_id_property(self) -> None:
+        """Add the recording id column to databases created before it existed."""
+        database = self.client.get_database(self.DB_ID)
+        if RECORDING_ID_PROPERTY in database.get("properties", {}):
+            return
+        payload = {"properties": {RECORDING_ID_PROPERTY: {"rich_text": {}}}}
+        try:
+            self.client.request("PATCH", f"databases/{self.DB_ID}", json=payload)
+        finally:
+            self.client.invalidate_database(self.DB_ID)
+
+    def _query_page(self) -> str | None:
+        query = {
+            "filter": {
+                "property": RECORDING_ID_PROPERTY,
+                "rich_text": {"equals": self.recording_id},
+            },
+            "page_size": 1,
+        }
+        results = self.client.request(
+            "POST", f"databases/{self.DB_ID}/query", json=query
+        ).get("results", [])
+        return results[0]["id"] if results else None
+
+    def _adopt_page(self, page_id: str) -> None:
+        """Take over this recording's page, lost from the manifest: keep its TOC."""
+        manifest = self._manifest
+        manifest.page_id, manifest.toc_id = page_id, None
+        manifest.sections.clear()
+        stale: list[str] = []
+        for block in self._list_children(page_id):
+            if block.get("type") == "table_of_contents" and manifest.toc_id is None:
+                manifest.toc_id = block["id"]
             else:
-                chunk += " " + sentence
-        chunks.append(chunk)  # Don't forget the last chunk
+                stale.append(block["id"])
+        self._delete_blocks(stale)
+        self.manifests.save(manifest)
+
+    def _upsert_sections(self, sections: list[tuple[str, list[dict]]]) -> None:
+        """Publish each (key, blocks) section unless it is already up to date.
+
+        Changed sections with no published section between them are written
+        together, packed into as few append requests as the limits allow.
+        """
+        manifest = self._manifest
+        changed: dict[str, tuple[str, list[dict]]] = {}
+        for key, blocks in sections:
+            digest = blocks_hash(blocks)
+            section = manifest.sections.get(key)
+            if section is not None and section.hash == digest:
+                metrics.incr("notion_sections", result="unchanged")
+                continue
+            if section is not None:
+                # Forget the old blocks first, so a crash before the new ones
+                # are written cannot leave the section marked as up to date.
+                del manifest.sections[key]
+                self.manifests.save(manifest)
+                self._delete_blocks(section.blocks)
+            changed[key] = (digest, blocks)
+            metrics.incr(
+                "notion_sections", result="new" if section is None else "changed"
+            )
 
-        return chunks
+        runs: list[list[str]] = []
+        previous_changed = False
+        for key in sorted({*manifest.sections, *changed}, key=section_order):
+            if key in changed:
+                if previous_changed:
+                    runs[-1].append(key)
+                else:
+                    runs.append([key])
+            previous_changed = key in changed
 
-    def _construct_text_obj(self, paragraphs: list) -> list:
-        full_text = []
-        for paragraph in paragraphs:
-            obj = {"paragraph": {"rich_text": [{"text": {"content": paragraph}}]}}
-            full_text.append(obj)
-        return full_text
+        for run in runs:
+            after = self._insert_after(run[0])
+            blocks = [block for key in run for block in changed[key][1]]
+            block_ids: list[str] = []
+            for request in pack_requests(blocks):
+                block_ids.extend(self._append_request(request, after))
+                if after is not None:
+                    after = block_ids[-1]
+                # Saved after every request so no written block goes
+                # untracked; a partly written section gets no hash and is
+                # rewritten next time.
+                start = 0
+                for key in run:
+                    digest, section_blocks = changed[key]
+                    written = block_ids[start : start + len(section_blocks)]
+                    if written:
+                        complete = len(written) == len(section_blocks)
+                        manifest.sections[key] = PageSection(
+                            digest if complete else "", written
+                        )
+                    start += len(section_blocks)
+                self.manifests.save(manifest)
 
-    def _contruct_header_obj(self, header_type: str, header: str) -> dict:
-        return {header_type: {"rich_text": [{"text": {"content": header}}]}}
+    def _append(self, blocks: list[dict], after: str | None = None) -> list[str]:
+        """Append *blocks* to the page (after block *after*); return their ids."""
+        block_ids: list[str] = []
+        for request in pack_requests(blocks):
+            block_ids.extend(self._append_request(request, after))
+            if after is not None:
+                after = block_ids[-1]
+        return block_ids
 
-    def _construct_list_obj(self, list_items: list) -> list:
-        full_list = []
-        for item in list_items:
-            obj = {"numbered_list_item": {"rich_text": [{"text": {"content": item}}]}}
-            full_list.append(obj)
-        return full_list
+    def _append_request(self, blocks: list[dict], after: str | None) -> list[str]:
+        payload: dict = {"children": blocks}
+        if after is not None:
+            payload["after"] = after
+        response = self.client.request("PATCH", self.url_update, json=payload)
+        return [block["id"] for block in response["results"][: len(blocks)]]
+
+    def _insert_after(self, key: str) -> str | None:
+        """Block the section *key* goes after; None appends to the page."""
+        position = section_order(key)
+        sections = self._manifest.sections
+        if all(section_order(other) < position for other in sections):
+            return None
+        before = [
+            other
+            for other in sections
+            if section_order(other) < position and sections[other].blocks
+        ]
+        if before:
+            return sections[max(before, key=section_order)].blocks[-1]
+        if self._manifest.toc_id is None:
+            self._manifest.toc_id = self._find_table_of_contents()
+        return self._manifest.toc_id
+
+    def _list_children(self, block_id: str) -> list[dict]:
+        blocks: list[dict] = []
+        cursor = None
+        while True:
+            path = f"blocks/{block_id}/children?page_size=100"
+            if cursor:
+                path += f"&start_cursor={cursor}"
+            page = self.client.request("GET", path)
+            blocks.extend(page.get("results", []))
+            cursor = page.get("next_cursor")
+            if not page.get("has_more") or not cursor:
+                return blocks
+
+    def _delete_blocks(self, block_ids: list[str]) -> None:
+        for block_id in block_ids:
+            try:
+                self.client.request("DELETE", f"blocks/{block_id}")
+            except NotionAPIError as exc:
+                # Already removed by hand.
+                if exc.status not in _GONE:
+                    raise
+
+    def _create_chunk_payload(self, chunk: Chunk, chunk_idx: int) -> dict:
+        blocks = [heading_block("heading_1", f"{chunk_idx}. {chunk.title}")]
+        blocks.extend(paragraph_blocks(chunk.transcript))
+        blocks.append(heading_block("heading_2", "Summary"))
+        blocks.extend(self._construct_summary_blocks(chunk))
+        return {"children": blocks}
+
+    def _create_overview_payload(self, overview: Chunk) -> dict:
+        blocks = [heading_block("heading_1", f"Overview: {overview.title}")]
+        blocks.extend(self._construct_summary_blocks(overview))
+        blocks.append({"divider": {}})
+        return {"children": blocks}
+
+    def _construct_summary_blocks(self, chunk: Chunk) -> list:
+        blocks = paragraph_blocks(chunk.summary)
+        blocks.append(heading_block("heading_2", "Main points"))
+        blocks.extend(list_blocks(chunk.main_points))
+        blocks.append(heading_block("heading_2", "Follow ups"))
+        blocks.extend(list_blocks(chunk.follow_up))
+        return blocks
 
     # ------------------------------------------------------------------
     #  New methods: DB schema verification & automatic fixing
@@ -153,20 +365,20 @@ class NotionPage:
     def verify_db_schema(self) -> Tuple[bool, Dict[str, str]]:
         """Check that the Notion database contains all required properties.
 
+        The database object is fetched once per process by the shared client.
+
         Returns
         -------
         Tuple[bool, Dict[str, str]]
             * bool – True if the schema is correct, False otherwise.
             * dict – Mapping of property names to an error message (missing or wrong type).
         """
-        url = f"https://api.notion.com/v1/databases/{self.DB_ID}"
-        resp = requests.get(url, headers=self.headers)
-        if resp.status_code != 200:
-            raise RuntimeError(
-                f"Failed to fetch Notion DB schema: {resp.status_code} - {resp.text}"
-            )
+        try:
+            database = self.client.get_database(self.DB_ID)
+        except RuntimeError as exc:
+            raise RuntimeError(f"Failed to fetch Notion DB schema: {exc}") from exc
 
-        db_props = resp.json().get("properties", {})
+        db_props = database.get("properties", {})
         errors: Dict[str, str] = {}
         for name, expected_type in self.REQUIRED_PROPERTIES.items():
             if name not in db_props:
@@ -197,12 +409,14 @@ class NotionPage:
                 correct_type
             )
 
-        url = f"https://api.notion.com/v1/databases/{self.DB_ID}"
-        resp = requests.patch(url, json=update_payload, headers=self.headers)
-        if resp.status_code != 200:
-            raise RuntimeError(
-                f"Failed to update Notion DB schema: {resp.status_code} - {resp.text}"
+        try:
+            self.client.request(
+                "PATCH", f"databases/{self.DB_ID}", json=update_payload
             )
+        except RuntimeError as exc:
+            raise RuntimeError(f"Failed to update Notion DB schema: {exc}") from exc
+        finally:
+            self.client.invalidate_database(self.DB_ID)
 
     # ---------------------  helpers  ----------------------------------
     def _build_property_definition(self, prop_type: str) -> Dict:
@@ -213,4 +427,6 @@ class NotionPage:
             return {"number": {"format": "number"}}
         if prop_type == "select":
             return {"select": {}}
+        if prop_type == "rich_text":
+            return {"rich_text": {}}
         raise ValueError(f"Unsupported property type: {prop_type}")
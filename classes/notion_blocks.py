@@ -0,0 +1,107 @@
+from typing import Any
+
+import config
+
+# Limits of the Notion API.
+TEXT_MAX_CHARS = 2000  # characters per rich-text item
+RICH_TEXT_MAX_ITEMS = 100  # rich-text items per block
+CHILDREN_MAX = 100  # blocks per append request
+# Text per append request, well below the 500 KB payload limit.
+REQUEST_MAX_CHARS = 200_000
+
+_SENTENCE_ENDS = (". ", "! ", "? ")
+
+
+def split_text(text: str, limit: int = TEXT_MAX_CHARS) -> list[str]:
+    """Split *text* into pieces of at most *limit* characters, in one pass.
+
+    Pieces end after a sentence where possible, else after a space, else
+    mid-word; a cut is only searched in the second half of each window, so
+    every character is looked at a bounded number of times. Joined, the
+    pieces give back *text* exactly.
+    """
+    pieces: list[str] = []
+    start = 0
+    while len(text) - start > limit:
+        end = start + limit
+        floor = start + limit // 2
+        cut = max(text.rfind(mark, floor, end) for mark in _SENTENCE_ENDS)
+        if cut != -1:
+            cut += 2
+        else:
+            cut = text.rfind(" ", floor, end)
+            cut = end if cut == -1 else cut + 1
+        pieces.append(text[start:cut])
+        start = cut
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def rich_text(text: str) -> list[dict[str, Any]]:
+    """Rich-text runs of *text*; anything beyond the item cap is dropped."""
+    runs = split_text(text.strip())[:RICH_TEXT_MAX_ITEMS]
+    return [{"text": {"content": run}} for run in runs]
+
+
+def paragraph_blocks(
+    text: str, block_chars: int = config.NOTION_PARAGRAPH_CHARS
+) -> list[dict[str, Any]]:
+    """Paragraph blocks of up to *block_chars* characters each.
+
+    Each block holds as many rich-text runs as fit, split at sentence ends,
+    so a long transcript needs few blocks and requests.
+    """
+    blocks: list[dict[str, Any]] = []
+    runs: list[str] = []
+    size = 0
+    for piece in split_text(text.strip()):
+        full = len(runs) == RICH_TEXT_MAX_ITEMS
+        if runs and (full or size + len(piece) > block_chars):
+            blocks.append(_paragraph(runs))
+            runs, size = [], 0
+        runs.append(piece)
+        size += len(piece)
+    if runs:
+        blocks.append(_paragraph(runs))
+    return blocks
+
+
+def heading_block(heading_type: str, text: str) -> dict[str, Any]:
+    return {heading_type: {"rich_text": rich_text(text)}}
+
+
+def list_blocks(items: list[str]) -> list[dict[str, Any]]:
+    return [{"numbered_list_item": {"rich_text": rich_text(item)}} for item in items]
+
+
+def pack_requests(blocks: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """Group *blocks* into as few append requests as the limits allow."""
+    requests: list[list[dict[str, Any]]] = []
+    current: list[dict[str, Any]] = []
+    size = 0
+    for block in blocks:
+        chars = _text_chars(block)
+        full = len(current) == CHILDREN_MAX
+        if current and (full or size + chars > REQUEST_MAX_CHARS):
+            requests.append(current)
+            current, size = [], 0
+        current.append(block)
+        size += chars
+    if current:
+        requests.append(current)
+    return requests
+
+
+# ---------------------  helpers  ----------------------------------
+def _paragraph(runs: list[str]) -> dict[str, Any]:
+    # Whitespace between runs is kept, only the block's edges are trimmed.
+    runs = list(runs)
+    runs[0] = runs[0].lstrip()
+    runs[-1] = runs[-1].rstrip()
+    return {"paragraph": {"rich_text": [{"text": {"content": run}} for run in runs]}}
+
+
+def _text_chars(block: dict[str, Any]) -> int:
+    body = next(iter(block.values()))
+    return sum(len(item["text"]["content"]) for item in body.get("rich_text", []))
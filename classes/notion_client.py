@@ -0,0 +1,177 @@
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+from .metrics import metrics
+from .rate_limit import TokenBucket
+
+NOTION_VERSION = "2022-06-28"
+
+
+class NotionAPIError(RuntimeError):
+    """A Notion request that failed for good; *status* is 0 without a reply."""
+
+    def __init__(self, message: str, status: int = 0):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class NotionClient:
+    """Pooled, rate-limited HTTP client for the Notion API.
+
+    A single instance is meant to be shared by every `NotionPage` (see
+    `get_notion_client`). Requests go through a token bucket sized to
+    Notion's average limit, and 429/5xx answers or connection errors are
+    retried with exponential backoff, honouring ``Retry-After`` when sent.
+    """
+
+    api_key: str
+    base_url: str = config.NOTION_BASE_URL
+    requests_per_second: float = config.NOTION_RPS
+    max_retries: int = config.NOTION_MAX_RETRIES
+    backoff: float = 1.0
+    timeout: float = 30.0
+    pool_size: int = 10
+
+    session: requests.Session = field(init=False, repr=False)
+    _bucket: TokenBucket = field(init=False, repr=False)
+    _databases: dict[str, dict[str, Any]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _db_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size, pool_maxsize=self.pool_size
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "Notion-Version": NOTION_VERSION,
+            }
+        )
+        self._bucket = TokenBucket(
+            self.requests_per_second, capacity=max(self.requests_per_second, 1.0)
+        )
+
+    # ------------------------------------------------------------------
+    #  Public API
+    # ------------------------------------------------------------------
+    def request(
+        self, method: str, path: str, json: dict | None = None
+    ) -> dict[str, Any]:
+        """Send a request and return the decoded JSON body.
+
+        Raises `NotionAPIError` (a ``RuntimeError``) for non-retryable errors
+        or once the retries are exhausted.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        # Only the resource type is used as a label, never ids.
+        endpoint = path.strip("/").split("/")[0]
+        error = ""
+        status = 0
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                metrics.incr("notion_retries", endpoint=endpoint)
+            self._bucket.acquire()
+            retry_after = None
+            try:
+                response = self.session.request(
+                    method, url, json=json, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = str(exc)
+            else:
+                status = response.status_code
+                if response.ok:
+                    self._record(method, endpoint, status, attempt, start)
+                    return response.json()
+                error = f"{response.status_code} - {response.text}"
+                if not self._is_retryable(response.status_code):
+                    break
+                retry_after = self._parse_retry_after(response)
+
+            if attempt < self.max_retries:
+                time.sleep(self._delay(attempt, retry_after))
+
+        self._record(method, endpoint, status, attempt, start)
+        raise NotionAPIError(f"Notion {method} {path} failed: {error}", status)
+
+    def get_database(self, db_id: str, refresh: bool = False) -> dict[str, Any]:
+        """Return the database object, fetched at most once per process."""
+        with self._db_lock:
+            if refresh or db_id not in self._databases:
+                self._databases[db_id] = self.request("GET", f"databases/{db_id}")
+            return self._databases[db_id]
+
+    def invalidate_database(self, db_id: str) -> None:
+        with self._db_lock:
+            self._databases.pop(db_id, None)
+
+    # ---------------------  helpers  ----------------------------------
+    @staticmethod
+    def _record(
+        method: str, endpoint: str, status: int, retries: int, start: float
+    ) -> None:
+        latency = time.perf_counter() - start
+        metrics.incr("notion_requests", method=method, endpoint=endpoint)
+        metrics.observe("notion_latency_seconds", latency, endpoint=endpoint)
+        metrics.event(
+            "notion_request",
+            method=method,
+            endpoint=endpoint,
+            status=status,
+            retries=retries,
+            latency_s=round(latency, 4),
+        )
+
+    @staticmethod
+    def _is_retryable(status_code: int) -> bool:
+        return status_code == 429 or status_code >= 500
+
+    @staticmethod
+    def _parse_retry_after(response: requests.Response) -> float | None:
+        value = response.headers.get("Retry-After")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def _delay(self, attempt: int, retry_after: float | None) -> float:
+        if retry_after is not None:
+            return retry_after
+        return self.backoff * 2**attempt * random.uniform(0.8, 1.2)
+
+
+_shared_client: NotionClient | None = None
+_shared_lock = threading.Lock()
+
+
+def get_notion_client() -> NotionClient:
+    """Return the process-wide `NotionClient`, creating it on first use."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            api_key = os.environ.get("NOTION_API_KEY")
+            if not api_key:
+                raise EnvironmentError(
+                    "NOTION_API_KEY is not set. Please configure it in your .env file."
+                )
+            _shared_client = NotionClient(api_key)
+        return _shared_client
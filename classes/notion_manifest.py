@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class PageSection:
+    """One published range of blocks: its content hash and block ids."""
+
+    hash: str
+    blocks: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PageManifest:
+    """What has been published for one recording.
+
+    Keyed by the recording's content hash, so the page is found again even
+    after the checkpoint is gone. Sections are ``"overview"`` and the chunk
+    indices as strings, and appear on the page in `section_order`.
+    """
+
+    recording_id: str
+    page_id: str | None = None
+    toc_id: str | None = None
+    sections: dict[str, PageSection] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "PageManifest":
+        return cls(
+            recording_id=data["recording_id"],
+            page_id=data.get("page_id"),
+            toc_id=data.get("toc_id"),
+            sections={
+                key: PageSection(**section)
+                for key, section in data.get("sections", {}).items()
+            },
+        )
+
+
+def section_order(key: str) -> int:
+    """Position of a section on the page: the overview first, then chunks."""
+    return 0 if key == "overview" else int(key)
+
+
+def blocks_hash(blocks: list[dict[str, Any]]) -> str:
+    blob = json.dumps(blocks, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class ManifestStore:
+    """Directory of JSON page manifests, one per recording."""
+
+    root: Path
+
+    def __post_init__(self):
+        self.root = Path(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def load(self, recording_id: str) -> PageManifest:
+        path = self._path(recording_id)
+        if not path.exists():
+            return PageManifest(recording_id)
+        with open(path, "r", encoding="utf-8") as file:
+            return PageManifest.from_dict(json.load(file))
+
+    def save(self, manifest: PageManifest) -> None:
+        path = self._path(manifest.recording_id)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(manifest.to_dict(), file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def _path(self, recording_id: str) -> Path:
+        return self.root / f"{recording_id}.json"
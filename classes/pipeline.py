@@ -0,0 +1,119 @@
+import queue
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .metrics import metrics
+
+# Marks the end of the input on a stage queue.
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One step of a `Pipeline`.
+
+    *handler* receives an item and returns the item to hand to the next
+    stage, or ``None`` to drop it. *queue_size* bounds the stage's inbox, so
+    a slow stage blocks its producers instead of letting work pile up.
+    """
+
+    name: str
+    handler: Callable[[Any], Any]
+    workers: int = 1
+    queue_size: int = 2
+
+
+@dataclass
+class Pipeline:
+    """Threaded producer/consumer pipeline with one bounded queue per stage.
+
+    Items flow through the stages in order and different items can be in
+    different stages at the same time. An exception raised by a handler
+    drops that item from every later stage and is reported to *on_error*.
+    """
+
+    stages: list[Stage]
+    on_error: Callable[[Any, Stage, Exception], None] | None = None
+
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def run(self, items: Iterable[Any]) -> list[Any]:
+        """Feed *items* through all stages and return the ones that finished."""
+        if not self.stages:
+            return list(items)
+
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        running = [stage.workers for stage in self.stages]
+        finished: list[Any] = []
+
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(idx, queues, running, finished),
+                name=f"{stage.name}-{n}",
+                daemon=True,
+            )
+            for idx, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        return finished
+
+    def _work(
+        self,
+        idx: int,
+        queues: list[queue.Queue],
+        running: list[int],
+        finished: list[Any],
+    ) -> None:
+        stage = self.stages[idx]
+        is_last = idx == len(self.stages) - 1
+        try:
+            with metrics.profile_thread(stage.name):
+                while True:
+                    item = queues[idx].get()
+                    if item is _DONE:
+                        break
+                    try:
+                        result = stage.handler(item)
+                    except Exception as exc:
+                        self._report(item, stage, exc)
+                        continue
+                    if result is None:
+                        continue
+                    if is_last:
+                        with self._lock:
+                            finished.append(result)
+                    else:
+                        queues[idx + 1].put(result)
+        finally:
+            # The last worker of a stage to finish closes the next stage,
+            # even if this worker died, so `run` never waits forever.
+            with self._lock:
+                running[idx] -= 1
+                closing = running[idx] == 0
+            if closing and not is_last:
+                for _ in range(self.stages[idx + 1].workers):
+                    queues[idx + 1].put(_DONE)
+
+    def _report(self, item: Any, stage: Stage, exc: Exception) -> None:
+        if self.on_error is None:
+            return
+        try:
+            self.on_error(item, stage, exc)
+        except Exception as handler_exc:
+            # A failing callback must not take the stage's thread down.
+            print(f"{stage.name}: error handler failed: {handler_exc!r} ({exc!r})")
@@ -0,0 +1,413 @@
+import queue
+import threading
+from collections import deque
+from collections.abc import Callable, Collection, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import config
+
+from .chatGPT import ChatGPTUtils
+from .checkpoint import CheckpointStore, RecordingState
+from .discovery import ARCHIVE_FOLDER
+from .notion import NotionPage
+from .notion_manifest import ManifestStore
+from .metrics import metrics
+from .pipeline import Pipeline, Stage
+from .recordings import Recording
+from .transcription import TranscriptionEngine, iter_transcribe_segments
+from .utils import (
+    get_chunks_from_transcription,
+    get_recording,
+    hash_file,
+    iter_chunks_from_segments,
+    move_to_folder,
+)
+
+
+_END = object()
+
+
+@dataclass
+class ChunkStream:
+    """Chunks produced by a background streaming transcription.
+
+    The producer thread only passes (text, end time) pairs over a bounded
+    queue; the consuming thread owns the checkpoint. Closing the stream stops
+    the producer before its next chunk, and *on_done* always runs when the
+    producer exits.
+    """
+
+    produce: Callable[[], Iterator[tuple[str, float]]]
+    on_done: Callable[[], None]
+    maxsize: int = 2
+
+    _queue: queue.Queue = field(init=False, repr=False)
+    _stop: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self._queue = queue.Queue(maxsize=self.maxsize)
+
+    def start(self) -> None:
+        threading.Thread(
+            target=self._run, name="transcribe-stream", daemon=True
+        ).start()
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def __iter__(self) -> Iterator[tuple[str, float]]:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.close()
+
+    def _run(self) -> None:
+        try:
+            for item in self.produce():
+                if not self._put(item):
+                    return
+            self._put(_END)
+        except Exception as exc:
+            self._put(exc)
+        finally:
+            self.on_done()
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+@dataclass
+class RecordingJob:
+    """A recording travelling through the pipeline stages."""
+
+    path: Path
+    recording: Recording | None = None
+    state: RecordingState | None = None
+    # Set when the recording is transcribed in streaming mode.
+    stream: ChunkStream | None = None
+    enriched_feed: Iterator[int] | None = None
+
+
+@dataclass
+class RecordingProcessor:
+    """The per-recording steps of the pipeline, resumable via checkpoints.
+
+    Every finished step is persisted before the next one starts, so a crash
+    only repeats the step that was in progress. The steps can be run one
+    after the other with `process` or overlapped across recordings with
+    `build_pipeline`.
+    """
+
+    model: TranscriptionEngine
+    gpt_utils: ChatGPTUtils
+    store: CheckpointStore
+    # Publishing upserts the Notion page when set (see `NotionPage`).
+    manifests: ManifestStore | None = None
+
+    # Once set, no new recording is started and enrichment stops after the
+    # chunks already in flight; the rest resumes from the checkpoint.
+    stop: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+    # Bounds concurrent Whisper runs on the shared model, streaming included.
+    _whisper_slots: threading.Semaphore = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._whisper_slots = threading.Semaphore(config.TRANSCRIBE_WORKERS)
+
+    def process(self, path: Path) -> None:
+        job = RecordingJob(path)
+        for name, step in self._steps():
+            job = _timed(name, step)(job)
+            if job is None:
+                return
+
+    def build_pipeline(
+        self,
+        on_error=None,
+        on_archived=None,
+        steps: Collection[str] | None = None,
+        archive_with: Callable[[RecordingJob], Any] | None = None,
+    ) -> Pipeline:
+        """Return a pipeline of all steps, or only the ones named in *steps*.
+
+        *archive_with* replaces `archive` as the last step, e.g. to archive
+        a recording only while its queue lease is still held.
+        """
+
+        def archive(job: RecordingJob) -> RecordingJob:
+            (archive_with or self.archive)(job)
+            if on_archived is not None:
+                on_archived(job)
+            return job
+
+        workers = {
+            "transcribe": config.TRANSCRIBE_WORKERS,
+            "enrich": config.ENRICH_WORKERS,
+            "publish": config.PUBLISH_WORKERS,
+        }
+        handlers = dict(self._steps(), archive=archive)
+        return Pipeline(
+            [
+                Stage(name, _timed(name, step), workers.get(name, 1))
+                for name, step in handlers.items()
+                if steps is None or name in steps
+            ],
+            on_error=on_error,
+        )
+
+    def _steps(self) -> list[tuple[str, Callable[[RecordingJob], Any]]]:
+        return [
+            ("transcribe", self.transcribe),
+            ("chunk", self.chunk),
+            ("enrich", self.enrich),
+            ("publish", self.publish),
+            ("overview", self.overview),
+            ("archive", self.archive),
+        ]
+
+    # ------------------------------------------------------------------
+    #  Stages
+    # ------------------------------------------------------------------
+    def transcribe(self, job: RecordingJob) -> RecordingJob | None:
+        if self.stop.is_set():
+            return None
+        job.state = self.store.load(hash_file(job.path))
+        state = job.state
+        if state.transcript is not None and state.duration is not None:
+            # Already transcribed: the later steps only need the metadata.
+            job.recording = get_recording(job.path, duration=state.duration)
+            return job
+
+        job.recording = get_recording(job.path)
+        # Checkpointed along with the transcript or the first streamed chunk.
+        state.duration = job.recording.duration
+        if state.transcript is not None:
+            job.recording.release_audio()
+            return job
+
+        # A stream interrupted in a previous run is always resumed as a stream.
+        if config.STREAMING_TRANSCRIPTION or state.chunks is not None:
+            job.stream = self._start_stream(job)
+            return job
+
+        # Decoded once here and handed to Whisper as samples, so the file is
+        # not decoded a second time by Whisper's own ffmpeg call.
+        name = job.path.name
+        try:
+            with metrics.stage("decode", name) as timing:
+                audio = job.recording.load_audio()
+                timing["audio_seconds"] = job.recording.decoded_seconds
+            with self._whisper_slots, metrics.stage("whisper", name) as timing:
+                result = self.model.transcribe(
+                    audio, language=job.recording.language.value
+                )
+                timing["audio_seconds"] = job.recording.decoded_seconds
+                job.recording.skipped_seconds = result.get("skipped_seconds", 0.0)
+                timing["skipped_seconds"] = round(job.recording.skipped_seconds, 1)
+        finally:
+            job.recording.release_audio()
+        state.transcript = str(result["text"])
+        self.store.save(state)
+        self._report_skipped(job)
+        return job
+
+    def chunk(self, job: RecordingJob) -> RecordingJob:
+        if job.state.chunks is None:
+            job.state.chunks = get_chunks_from_transcription(
+                job.state.transcript,
+                max_tokens=self.gpt_utils.chunk_token_budget(job.recording.language),
+            )
+            self.store.save(job.state)
+        return job
+
+    def enrich(self, job: RecordingJob) -> RecordingJob:
+        feed = self._iter_enriched(job)
+        if job.stream is not None:
+            # Streaming: the publish stage pulls chunks through enrichment as
+            # soon as the transcription produces them.
+            job.enriched_feed = feed
+        else:
+            for _ in feed:
+                pass
+        return job
+
+    def publish(self, job: RecordingJob) -> RecordingJob:
+        state = job.state
+        try:
+            notion_page = self._notion_page(job)
+            if state.page_id is None:
+                state.page_id = notion_page.page_id
+                self.store.save(state)
+
+            # Chunks are published in index order so the page always reads
+            # the same, however the enrichment requests were scheduled. All
+            # chunks ready at once go out together, in as few requests as fit.
+            def publish_ready() -> None:
+                ready = []
+                idx = state.last_published + 1
+                while idx <= len(state.chunks) and idx in state.enriched:
+                    ready.append((idx, state.enriched[idx]))
+                    idx += 1
+                if ready:
+                    notion_page.publish_chunks(ready)
+                    state.last_published = ready[-1][0]
+                    self.store.save(state)
+
+            publish_ready()
+            for _ in job.enriched_feed or ():
+                publish_ready()
+            if state.transcript is not None:
+                notion_page.remove_chunks_after(len(state.chunks))
+        finally:
+            if job.stream is not None:
+                job.stream.close()
+
+        # A stopped stream leaves the transcript unfinished.
+        if state.transcript is None or state.last_published < len(state.chunks):
+            if self.stop.is_set():
+                raise RuntimeError(
+                    f"Stopped after {state.last_published} of {len(state.chunks)} "
+                    "chunks; the rest resumes from the checkpoint"
+                )
+            raise RuntimeError(
+                f"Only {state.last_published} of {len(state.chunks)} chunks published"
+            )
+        return job
+
+    def overview(self, job: RecordingJob) -> RecordingJob:
+        """Reduce the checkpointed chunk results into a lecture overview."""
+        state = job.state
+        if not config.LECTURE_OVERVIEW or state.overview_published:
+            return job
+        if state.overview is None:
+            state.overview = self.gpt_utils.summarize_lecture(
+                [state.enriched[idx] for idx in sorted(state.enriched)],
+                language=job.recording.language,
+            )
+            self.store.save(state)
+        notion_page = self._notion_page(job)
+        notion_page.publish_overview(state.overview)
+        state.overview_published = True
+        self.store.save(state)
+        return job
+
+    def archive(self, job: RecordingJob) -> RecordingJob:
+        move_to_folder(job.path, ARCHIVE_FOLDER)
+        self.store.discard(job.state.audio_hash)
+        return job
+
+    # ---------------------  helpers  ----------------------------------
+    def _notion_page(self, job: RecordingJob) -> NotionPage:
+        return NotionPage(
+            job.recording,
+            page_id=job.state.page_id,
+            recording_id=job.state.audio_hash,
+            manifests=self.manifests,
+        )
+
+    def _start_stream(self, job: RecordingJob) -> ChunkStream:
+        state = job.state
+        # The stream decodes its own bounded windows.
+        job.recording.release_audio()
+        if state.chunks is None:
+            state.chunks = []
+        offset = state.chunk_ends[-1] if state.chunk_ends else 0.0
+
+        def skipped(seconds: float) -> None:
+            job.recording.skipped_seconds += seconds
+
+        self._whisper_slots.acquire()
+        stream = ChunkStream(
+            lambda: iter_chunks_from_segments(
+                iter_transcribe_segments(
+                    self.model,
+                    job.path,
+                    offset,
+                    language=job.recording.language.value,
+                    on_skipped=skipped,
+                ),
+                max_tokens=self.gpt_utils.chunk_token_budget(job.recording.language),
+            ),
+            on_done=self._whisper_slots.release,
+        )
+        stream.start()
+        return stream
+
+    def _iter_texts(self, job: RecordingJob) -> Iterator[tuple[int, str]]:
+        """Yield (index, text) of every chunk that still needs enrichment."""
+        state = job.state
+        known = len(state.chunks)
+        for idx in range(1, known + 1):
+            if self.stop.is_set():
+                return
+            if idx not in state.enriched:
+                yield idx, state.chunks[idx - 1]
+
+        if job.stream is not None:
+            # Each streamed chunk is checkpointed with its audio end time
+            # before it is sent for enrichment.
+            for text, end in job.stream:
+                if self.stop.is_set():
+                    # The stream resumes after the last saved chunk.
+                    return
+                state.chunks.append(text)
+                state.chunk_ends.append(end)
+                self.store.save(state)
+                yield len(state.chunks), text
+            state.transcript = " ".join(state.chunks)
+            self.store.save(state)
+            self._report_skipped(job)
+
+    @staticmethod
+    def _report_skipped(job: RecordingJob) -> None:
+        skipped = job.recording.skipped_seconds
+        if skipped:
+            metrics.incr("silence_skipped_seconds", skipped)
+            metrics.event(
+                "silence_trimmed",
+                recording=job.path.name,
+                skipped_seconds=round(skipped, 1),
+                audio_seconds=job.recording.duration,
+            )
+
+    def _iter_enriched(self, job: RecordingJob) -> Iterator[int]:
+        """Enrich pending chunks, yielding each index once it is saved."""
+        order: deque[int] = deque()
+
+        def texts() -> Iterator[str]:
+            for idx, text in self._iter_texts(job):
+                order.append(idx)
+                yield text
+
+        for chunk_obj in self.gpt_utils.get_additional_info_many(
+            texts(), language=job.recording.language
+        ):
+            idx = order.popleft()
+            job.state.enriched[idx] = chunk_obj
+            self.store.save(job.state)
+            yield idx
+
+
+def _timed(name: str, step: Callable[[RecordingJob], Any]) -> Callable:
+    def run(job: RecordingJob) -> Any:
+        with metrics.stage(name, job.path.name):
+            return step(job)
+
+    return run
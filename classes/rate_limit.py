@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+
+@dataclass
+class RateLimiter:
+    """Sliding one-minute window limiting requests and tokens per minute.
+
+    A limit of ``0`` disables the corresponding check. The limiter is
+    thread-safe so a single instance can be shared by concurrent workers.
+    """
+
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    window: float = field(default=60.0, repr=False)
+
+    _events: deque = field(default_factory=deque, init=False, repr=False)
+    _tokens_in_window: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until a request costing *tokens* fits in the current window."""
+        if self.tokens_per_minute:
+            # A single request larger than the whole budget would never fit.
+            tokens = min(tokens, self.tokens_per_minute)
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                if self._fits(tokens):
+                    self._events.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+                wait = self.window - (now - self._events[0][0])
+            time.sleep(max(wait, 0.01))
+
+    def _expire(self, now: float) -> None:
+        while self._events and now - self._events[0][0] >= self.window:
+            _, tokens = self._events.popleft()
+            self._tokens_in_window -= tokens
+
+    def _fits(self, tokens: int) -> bool:
+        if self.requests_per_minute and len(self._events) >= self.requests_per_minute:
+            return False
+        if (
+            self.tokens_per_minute
+            and self._tokens_in_window + tokens > self.tokens_per_minute
+        ):
+            return False
+        return True
+
+
+@dataclass
+class TokenBucket:
+    """Classic token bucket: *rate* tokens per second, bursts up to *capacity*."""
+
+    rate: float
+    capacity: float = 1.0
+
+    _tokens: float = field(init=False, repr=False)
+    _updated: float = field(default_factory=time.monotonic, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self._tokens = self.capacity
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until *tokens* tokens are available and consume them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
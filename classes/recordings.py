@@ -1,12 +1,34 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 
+import numpy as np
+
+import config
+
+from .audio import SAMPLE_RATE, decode_audio, release_audio
+
 
 class Language(Enum):
+    # Values are the ISO 639-1 codes Whisper expects.
     ENGLISH = "en"
     ITALIAN = "it"
 
+    @classmethod
+    def parse(cls, value: str) -> "Language":
+        """Accept a code ("it"), the config spelling ("ITA") or a name."""
+        key = value.strip().lower()
+        for language in cls:
+            name = language.name.lower()
+            if key in (language.value, name, name[:3]):
+                return language
+        raise ValueError(f"Unknown language {value!r}")
+
+    @property
+    def full_name(self) -> str:
+        """The language as named in the LLM prompts."""
+        return self.name.capitalize()
+
 
 @dataclass
 class Recording:
@@ -16,9 +38,29 @@ class Recording:
     owner: str
     duration: int
     subject: str
+    # Decoded 16 kHz mono samples, filled on first use by `load_audio`.
+    audio: np.ndarray | None = field(default=None, repr=False, compare=False)
+    # Seconds of silence cut out before transcription (see `SilenceTrimmer`).
+    skipped_seconds: float = field(default=0.0, compare=False)
 
     def get_short_subject(self) -> str:
         if len(self.subject) < 30:
             return self.subject
         else:
             return "".join([word[0].upper() for word in self.subject.split(" ")])
+
+    def load_audio(self) -> np.ndarray:
+        """Decode the file once and keep the buffer for later steps."""
+        if self.audio is None:
+            self.audio = decode_audio(
+                self.audio_path, self.duration, config.AUDIO_MMAP_DIR
+            )
+        return self.audio
+
+    def release_audio(self) -> None:
+        release_audio(self.audio)
+        self.audio = None
+
+    @property
+    def decoded_seconds(self) -> float:
+        return 0.0 if self.audio is None else len(self.audio) / SAMPLE_RATE
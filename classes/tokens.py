@@ -0,0 +1,25 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import tiktoken
+
+ENCODING_NAME = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name: str = ENCODING_NAME) -> "tiktoken.Encoding":
+    """Return the tokenizer, loading each encoding only once per process."""
+    import tiktoken
+
+    return tiktoken.get_encoding(name)
+
+
+def count_tokens(text: str) -> int:
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+
+def count_tokens_batch(texts: list[str]) -> list[int]:
+    """Token counts of *texts*, encoded in one multi-threaded batch."""
+    encoded = get_encoding().encode_batch(texts, disallowed_special=())
+    return [len(tokens) for tokens in encoded]
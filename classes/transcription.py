@@ -0,0 +1,362 @@
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+
+import config
+
+from .audio import (
+    SAMPLE_RATE,
+    decode_audio,
+    detect_silence,
+    iter_audio_windows,
+    trim_silence,
+)
+
+
+# Names accepted by TRANSCRIBE_ENGINE.
+ENGINES = ("whisper", "faster-whisper")
+
+
+class TranscriptionEngine(Protocol):
+    """What the pipeline needs from a speech-to-text backend.
+
+    `transcribe` takes 16 kHz mono float32 samples (or a file path) and
+    returns a dict shaped like openai-whisper's result: ``"text"`` and
+    ``"segments"`` with ``start``, ``end`` and ``text`` each. Keyword
+    arguments such as ``initial_prompt`` and ``language`` are optional.
+    `load` brings the model into memory ahead of the first recording.
+    A result may also report the ``"skipped_seconds"`` of audio that were
+    not transcribed.
+    """
+
+    def transcribe(self, audio: Any, **kwargs: Any) -> dict[str, Any]: ...
+
+    def load(self) -> Any: ...
+
+
+def create_engine(
+    engine: str = config.TRANSCRIBE_ENGINE,
+    model_name: str = config.WHISPER_MODEL,
+    threads: int = config.TRANSCRIBE_THREADS,
+    beam_size: int = config.TRANSCRIBE_BEAM_SIZE,
+) -> TranscriptionEngine:
+    """Return the (not yet loaded) engine named by *engine*."""
+    if engine == "whisper":
+        return LazyWhisperModel(model_name, threads, beam_size)
+    if engine == "faster-whisper":
+        return FasterWhisperEngine(model_name, threads, beam_size)
+    raise ValueError(
+        f"Unknown transcription engine {engine!r}; expected one of {ENGINES}"
+    )
+
+
+@dataclass
+class Segment:
+    """A piece of transcribed speech; times are seconds from the file start."""
+
+    start: float
+    end: float
+    text: str
+
+
+def iter_transcribe_segments(
+    model: Any,
+    audio_path: Path,
+    offset: float = 0.0,
+    window_seconds: float = config.STREAM_WINDOW_SECONDS,
+    language: str | None = None,
+    on_skipped: Callable[[float], None] | None = None,
+) -> Iterator[Segment]:
+    """Transcribe *audio_path* window by window, yielding Whisper segments.
+
+    Each window is conditioned on the tail of the previous one's text so the
+    wording stays consistent across window boundaries. *offset* skips the
+    first seconds of the file, which is how an interrupted stream resumes.
+    A known *language* spares the model its detection pass. *on_skipped*
+    receives the seconds of each window the model skipped.
+    """
+    prompt = None
+    window_start = offset
+    for window in iter_audio_windows(audio_path, window_seconds, offset):
+        result = model.transcribe(window, initial_prompt=prompt, language=language)
+        if on_skipped is not None and result.get("skipped_seconds"):
+            on_skipped(result["skipped_seconds"])
+        for segment in result["segments"]:
+            yield Segment(
+                window_start + segment["start"],
+                window_start + segment["end"],
+                segment["text"],
+            )
+        prompt = result["text"][-200:] or None
+        window_start += len(window) / SAMPLE_RATE
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    n_segments: int,
+    search_seconds: float = 60.0,
+    min_silence_ms: int = 700,
+) -> list[tuple[int, int]]:
+    """Return ``n_segments`` (start, end) sample ranges cut at silences.
+
+    The buffer is cut near every ``k / n_segments`` of its length, at the
+    middle of the longest silence found within *search_seconds* of that
+    point, so no word is split between two segments. Where no silence is
+    found the cut falls on the target point itself.
+    """
+    length = len(audio)
+    n_segments = max(1, min(n_segments, length // SAMPLE_RATE))
+    search = int(search_seconds * SAMPLE_RATE)
+    # One threshold for the whole recording, not per search window.
+    silences = detect_silence(audio, min_silence_ms=min_silence_ms)
+
+    cuts = [0]
+    for k in range(1, n_segments):
+        target = length * k // n_segments
+        lo = max(cuts[-1] + 1, target - search)
+        hi = min(length, target + search)
+        nearby = [(s, e) for s, e in silences if s >= lo and e <= hi]
+        if nearby:
+            start, end = max(nearby, key=lambda span: span[1] - span[0])
+            cuts.append((start + end) // 2)
+        else:
+            cuts.append(target)
+    cuts.append(length)
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+@dataclass
+class LazyWhisperModel:
+    """An openai-whisper model that is imported and loaded on first use.
+
+    Importing ``whisper`` pulls in torch and loading a model takes seconds
+    and gigabytes, so runs that never transcribe anything skip both.
+    *threads* caps torch's CPU threads (0 = its default).
+    """
+
+    name: str
+    threads: int = 0
+    beam_size: int = config.TRANSCRIBE_BEAM_SIZE
+
+    _model: Any = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def transcribe(self, audio: Any, **kwargs: Any) -> dict[str, Any]:
+        if self.beam_size > 1:
+            kwargs.setdefault("beam_size", self.beam_size)
+        return self.load().transcribe(audio, **kwargs)
+
+    def load(self) -> Any:
+        with self._lock:
+            if self._model is None:
+                import torch
+                import whisper
+
+                if self.threads > 0:
+                    torch.set_num_threads(self.threads)
+                self._model = whisper.load_model(self.name)
+            return self._model
+
+
+@dataclass
+class FasterWhisperEngine:
+    """Whisper on CTranslate2 (faster-whisper), int8-quantized on CPU.
+
+    Much faster than the PyTorch model on machines without a GPU, at a
+    small cost in accuracy; `benchmarks/bench_engines.py` measures both.
+    The package is optional and only imported on first use.
+    """
+
+    name: str
+    threads: int = 0
+    beam_size: int = config.TRANSCRIBE_BEAM_SIZE
+    device: str = config.TRANSCRIBE_DEVICE
+    compute_type: str = config.TRANSCRIBE_COMPUTE_TYPE
+
+    _model: Any = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def transcribe(
+        self,
+        audio: Any,
+        initial_prompt: str | None = None,
+        language: str | None = None,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        if isinstance(audio, Path):
+            audio = str(audio)
+        segments, _ = self.load().transcribe(
+            audio,
+            beam_size=self.beam_size,
+            initial_prompt=initial_prompt,
+            language=language,
+            **kwargs,
+        )
+        # Segments are decoded lazily by the generator.
+        result = [
+            {"start": segment.start, "end": segment.end, "text": segment.text}
+            for segment in segments
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in result).strip(),
+            "segments": result,
+        }
+
+    def load(self) -> Any:
+        with self._lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError as exc:
+                    raise EnvironmentError(
+                        "TRANSCRIBE_ENGINE=faster-whisper needs the faster-whisper "
+                        "package: pip install faster-whisper"
+                    ) from exc
+
+                self._model = WhisperModel(
+                    self.name,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    cpu_threads=self.threads,
+                )
+            return self._model
+
+
+@dataclass
+class SilenceTrimmer:
+    """Wrap an engine so that long silences are cut out before it runs.
+
+    Breaks, setup time and silence cost transcription time and invite
+    hallucinated text. Every silence of at least *min_skip_seconds* is
+    removed (see `trim_silence`), segment times are mapped back to the
+    untrimmed audio, and the result reports the ``"skipped_seconds"``.
+    """
+
+    engine: TranscriptionEngine
+    min_skip_seconds: float = config.TRIM_SILENCE_SECONDS
+    padding_seconds: float = config.TRIM_SILENCE_PADDING
+
+    def transcribe(self, audio: Any, **kwargs: Any) -> dict[str, Any]:
+        if isinstance(audio, (str, Path)):
+            audio = decode_audio(Path(audio))
+        speech, offsets = trim_silence(
+            audio, self.min_skip_seconds, self.padding_seconds
+        )
+        if len(speech) == 0:
+            result: dict[str, Any] = {"text": "", "segments": []}
+        else:
+            result = self.engine.transcribe(speech, **kwargs)
+        for segment in result.get("segments", []):
+            segment["start"] = offsets.to_original(segment["start"])
+            segment["end"] = offsets.to_original(segment["end"])
+        result["skipped_seconds"] = offsets.skipped_seconds
+        return result
+
+    def load(self) -> Any:
+        load = getattr(self.engine, "load", None)
+        return load() if load is not None else None
+
+    def close(self) -> None:
+        close = getattr(self.engine, "close", None)
+        if close is not None:
+            close()
+
+
+# Engine loaded once per worker process by `_init_worker`.
+_worker_model: Any = None
+
+
+def _init_worker(engine: str, model_name: str, threads: int) -> None:
+    global _worker_model
+    _worker_model = create_engine(engine, model_name, threads)
+    _worker_model.load()
+
+
+def _transcribe_span(
+    audio: np.ndarray | str, start: int, end: int, kwargs: dict[str, Any]
+) -> dict[str, Any]:
+    # A path means a memory-mapped buffer: map it instead of copying samples.
+    if isinstance(audio, str):
+        audio = np.memmap(audio, np.float32, mode="r")
+    span = np.ascontiguousarray(audio[start:end])
+    result = _worker_model.transcribe(span, **kwargs)
+    # Only what the parent needs is sent back; times are span-relative.
+    return {
+        "text": str(result["text"]).strip(),
+        "segments": [
+            {"start": s["start"], "end": s["end"], "text": s["text"]}
+            for s in result.get("segments", [])
+        ],
+    }
+
+
+@dataclass
+class ParallelTranscriber:
+    """Transcribe long recordings with a pool of engine worker processes.
+
+    Recordings are cut at silences into one span per worker, the spans are
+    transcribed in parallel (each worker owns a model of *engine* and its
+    share of the CPU threads) and the texts and segments are stitched back
+    in order, with segment times on the recording's timeline, so it can
+    stand in for a `TranscriptionEngine`. Keyword arguments such as
+    ``language`` and ``initial_prompt`` are passed on for every span.
+    Memory-mapped buffers are shared with the workers by file name;
+    in-memory ones are sent span by span. `close` shuts the pool down.
+    """
+
+    model_name: str
+    workers: int
+    engine: str = config.TRANSCRIBE_ENGINE
+
+    def __post_init__(self):
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        # Workers start lazily from a pipeline thread while other threads
+        # hold locks, which a forked child would inherit; spawn them fresh.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.engine, self.model_name, threads),
+        )
+
+    def transcribe(self, audio: np.ndarray | str | Path, **kwargs: Any) -> dict:
+        if isinstance(audio, (str, Path)):
+            audio = decode_audio(Path(audio))
+        spans = split_on_silence(audio, self.workers)
+        filename = getattr(audio, "filename", None)
+        if filename:
+            jobs = [(filename, start, end) for start, end in spans]
+        else:
+            jobs = [(audio[start:end], 0, end - start) for start, end in spans]
+        futures = [
+            self._executor.submit(_transcribe_span, *job, kwargs) for job in jobs
+        ]
+        texts: list[str] = []
+        segments: list[dict[str, Any]] = []
+        for (span_start, _), future in zip(spans, futures):
+            result = future.result()
+            if result["text"]:
+                texts.append(result["text"])
+            offset = span_start / SAMPLE_RATE
+            for segment in result["segments"]:
+                segment["start"] += offset
+                segment["end"] += offset
+                segments.append(segment)
+        return {"text": " ".join(texts), "segments": segments}
+
+    def load(self) -> None:
+        """Nothing to do here: each worker loads its model when it starts."""
+
+    def close(self) -> None:
+        self._executor.shutdown()
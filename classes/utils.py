@@ -1,21 +1,92 @@
+import hashlib
+import json
 import re
 import shutil
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
-import tiktoken
-from pydub import AudioSegment
-
 import config
 
+from .audio import SAMPLE_RATE, decode_audio, probe_duration
+from .discovery import ARCHIVE_FOLDER, AUDIO_EXTENSIONS
 from .recordings import Language, Recording
+from .tokens import count_tokens, count_tokens_batch
+from .transcription import Segment
+
+
+# Sidecar with "language" and/or "owner" keys next to a recording.
+SIDECAR_SUFFIX = ".json"
 
 
 def get_folder_meta(path: str) -> tuple[Language, str]:
+    """Parse an ``<owner>_<lang>`` folder name; raises ``ValueError`` if not."""
     chunks = path.split("_")
-    assert len(chunks) == 2
+    if len(chunks) != 2:
+        raise ValueError(f"{path!r} is not an <owner>_<lang> folder name")
     owner = chunks[0].lower()
-    language = chunks[1].lower()
-    return Language(language), owner
+    return Language.parse(chunks[1]), owner
+
+
+def resolve_recording_meta(file_path: Path) -> tuple[Language, str]:
+    """Return the language and owner of the recording at *file_path*.
+
+    Each is taken from the first source that has it: an ``<owner>_<lang>``
+    folder the file is in (nearest first), a ``<stem>.json`` sidecar, the
+    `config.FOLDER_META` entry of one of its folders, and finally the global
+    ``LANGUAGE`` and ``OWNER``.
+    """
+    language: Language | None = None
+    owner: str | None = None
+    folders = [
+        name for name in reversed(file_path.parent.parts) if name != ARCHIVE_FOLDER
+    ]
+
+    for name in folders:
+        try:
+            return get_folder_meta(name)
+        except ValueError:
+            continue
+
+    sidecar = file_path.with_suffix(SIDECAR_SUFFIX)
+    if sidecar.exists():
+        with open(sidecar, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        if meta.get("language"):
+            language = Language.parse(meta["language"])
+        owner = meta.get("owner") or None
+
+    for name in folders:
+        if name in config.FOLDER_META and (language is None or owner is None):
+            folder_language, folder_owner = get_folder_meta(config.FOLDER_META[name])
+            language = language or folder_language
+            owner = owner or folder_owner
+            break
+
+    return (
+        language or Language.parse(config.LANGUAGE),
+        owner or config.OWNER or "unknown",
+    )
+
+
+def order_by_language(paths: list[Path]) -> list[Path]:
+    """Group *paths* by recording language, keeping their order otherwise.
+
+    Consecutive recordings then share the transcription language, prompts
+    and chunk budget, and a batch holds one language after the other.
+    """
+    languages: dict[Path, Language | None] = {}
+    for path in paths:
+        try:
+            languages[path] = resolve_recording_meta(path)[0]
+        except (OSError, ValueError):
+            # Left for the run itself to report, after everything else.
+            languages[path] = None
+    first_seen = {
+        language: idx
+        for idx, language in enumerate(dict.fromkeys(languages.values()))
+        if language is not None
+    }
+    return sorted(paths, key=lambda path: first_seen.get(languages[path], len(paths)))
 
 
 # return the list of audio paths in each recording subfolder of each personal folder
@@ -24,53 +95,113 @@ def get_paths(recordings_folder_path: Path) -> list[Path]:
 
     The new folder structure contains only subject folders, so we no longer
     assume a fixed depth.  We therefore search recursively for files with the
-    desired audio extensions.
+    desired audio extensions, skipping the folders finished recordings are
+    archived into. Runs use the incremental `DiscoveryIndex` instead.
     """
-    audio_extensions = {".mp3", ".m4a"}
     return [
-        p for p in recordings_folder_path.rglob("*") if p.suffix in audio_extensions
+        p
+        for p in recordings_folder_path.rglob("*")
+        if p.suffix in AUDIO_EXTENSIONS
+        and ARCHIVE_FOLDER not in p.relative_to(recordings_folder_path).parts
     ]
 
 
-def get_recording(file_path: Path) -> Recording:
-    audio = AudioSegment.from_file(file_path)
-    duration = int(len(audio) / 1000)
+def get_recording(file_path: Path, duration: int | None = None) -> Recording:
+    # The duration comes from the container header; only files without
+    # usable metadata are decoded here, and that buffer is then reused.
+    # A *duration* already known (e.g. from a checkpoint) skips both.
+    audio = None
+    if duration is None:
+        try:
+            duration = int(probe_duration(file_path))
+        except RuntimeError:
+            audio = decode_audio(file_path, mmap_dir=config.AUDIO_MMAP_DIR)
+            duration = int(len(audio) / SAMPLE_RATE)
     subject_folder = file_path.parent.name
-    # Retrieve language and owner from the environment instead of the path
-    # Map language based on validated config
-    if config.LANGUAGE == "ENG":
-        language = Language.ENGLISH
-    else:
-        language = Language.ITALIAN
-
-    owner = config.OWNER or "unknown"
+    language, owner = resolve_recording_meta(file_path)
 
     return Recording(
-        file_path, file_path.stem, language, owner, duration, subject_folder
+        file_path, file_path.stem, language, owner, duration, subject_folder, audio
     )
 
 
+# Sentence ends: whitespace preceded by terminal punctuation.
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
 def get_chunks_from_transcription(transcription: str, max_tokens: int) -> list[str]:
-    sentences = re.split(r"(?<=[.!?])\s+", transcription)
-    encoding = tiktoken.get_encoding("cl100k_base")
-    chunks = []
-    current_chunk = ""
-    current_chunk_tokens = 0
-    for sentence in sentences:
-        num_tokens = len(encoding.encode(sentence))
-        if current_chunk_tokens + num_tokens <= max_tokens:
-            current_chunk += f" {sentence}"
-            current_chunk_tokens += num_tokens
-        else:
-            chunks.append(current_chunk)
-            current_chunk = sentence
-            current_chunk_tokens = num_tokens
-    if current_chunk != "":
-        chunks.append(current_chunk)
+    """Split *transcription* into chunks of at most *max_tokens* tokens.
+
+    Chunks end on sentence boundaries. All sentences are tokenized in one
+    batch, each with the space that precedes it once joined, so the count of
+    a chunk is exact. A single sentence longer than *max_tokens* becomes a
+    chunk of its own.
+    """
+    sentences = [s for s in _SENTENCE_BOUNDARY.split(transcription.strip()) if s]
+    spaced_tokens = count_tokens_batch([f" {sentence}" for sentence in sentences])
+
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for sentence, num_tokens in zip(sentences, spaced_tokens):
+        if current and current_tokens + num_tokens <= max_tokens:
+            current.append(sentence)
+            current_tokens += num_tokens
+            continue
+        if current:
+            chunks.append(" ".join(current))
+        # The first sentence of a chunk has no leading space.
+        current = [sentence]
+        current_tokens = count_tokens(sentence)
+    if current:
+        chunks.append(" ".join(current))
     return chunks
 
 
+def iter_chunks_from_segments(
+    segments: Iterable[Segment], max_tokens: int
+) -> Iterator[tuple[str, float]]:
+    """Streaming counterpart of `get_chunks_from_transcription`.
+
+    Segments are packed whole, so every chunk ends on a segment boundary and
+    is yielded together with its end time as soon as the next segment would
+    overflow *max_tokens*.
+    """
+    texts: list[str] = []
+    tokens = 0
+    end = 0.0
+    for segment in segments:
+        text = segment.text.strip()
+        if not text:
+            continue
+        if texts:
+            num_tokens = count_tokens(f" {text}")
+            if tokens + num_tokens > max_tokens:
+                yield " ".join(texts), end
+                texts = []
+        if not texts:
+            num_tokens = count_tokens(text)
+            tokens = 0
+        texts.append(text)
+        tokens += num_tokens
+        end = segment.end
+    if texts:
+        yield " ".join(texts), end
+
+
+def hash_file(file_path: Path, block_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of the file content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        while block := file.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 def move_to_folder(audio_path: Path, folder: str) -> None:
     processed_folder = audio_path.parent / folder
     processed_folder.mkdir(exist_ok=True, parents=True)
     shutil.move(audio_path, processed_folder)
+    sidecar = audio_path.with_suffix(SIDECAR_SUFFIX)
+    if sidecar.exists():
+        shutil.move(sidecar, processed_folder)
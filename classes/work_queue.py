@@ -0,0 +1,314 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import config
+
+from .audio import probe_duration
+from .metrics import metrics
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+MISSING = "missing"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass(frozen=True)
+class Lease:
+    """A claimed job; only the holder of *token* may renew or finish it."""
+
+    key: str
+    path: Path
+    token: str
+
+
+@dataclass
+class WorkQueue:
+    """Durable queue of recordings shared by workers on any number of hosts.
+
+    One job per recording under *root*, keyed by its path relative to
+    *root*, so hosts may mount the volume at different places. The
+    database lives on the shared volume and every change runs in a
+    ``BEGIN IMMEDIATE`` transaction, which SQLite serializes with a file
+    lock, so two workers never claim the same job. A claim is a lease of
+    *lease_seconds* that the holder renews with `heartbeat`; leases of
+    crashed workers expire and their jobs are queued again, up to
+    *max_attempts* claims per job. Longer recordings are claimed first
+    (or shorter ones, without *longest_first*). Lease expiry compares
+    wall clocks, so the hosts' clocks must be kept in sync (e.g. NTP).
+
+    The rollback journal is used instead of WAL, which needs shared memory
+    and does not work on network filesystems.
+    """
+
+    path: Path
+    root: Path
+    worker_id: str = field(default_factory=default_worker_id)
+    lease_seconds: float = config.QUEUE_LEASE_SECONDS
+    max_attempts: int = config.QUEUE_MAX_ATTEMPTS
+    retry_seconds: float = config.QUEUE_RETRY_SECONDS
+    longest_first: bool = config.QUEUE_LONGEST_FIRST
+
+    _conn: sqlite3.Connection = field(init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self.path = Path(self.path)
+        self.root = Path(self.root)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Transactions are opened explicitly, see `_transaction`.
+        self._conn = sqlite3.connect(
+            self.path, timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode = DELETE")
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " key TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " duration REAL NOT NULL,"
+                " status TEXT NOT NULL,"
+                " owner TEXT,"
+                " token TEXT,"
+                " lease_expires REAL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " available_at REAL NOT NULL DEFAULT 0,"
+                " error TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_claim"
+                " ON jobs (status, duration, available_at)"
+            )
+
+    # ------------------------------------------------------------------
+    #  Public API
+    # ------------------------------------------------------------------
+    def enqueue(
+        self,
+        paths: Iterable[Path],
+        settle_seconds: float = 0,
+        duration: Callable[[Path], float] = probe_duration,
+    ) -> int:
+        """Add a job for every recording in *paths* not queued yet.
+
+        Files modified within the last *settle_seconds* may still be being
+        copied and are left for a later call. A file that replaced a finished
+        or failed one of the same name (different size or mtime), or that
+        came back after going missing, is queued again with a fresh attempt
+        count. *duration* sets the priority and is only called for those
+        files. Returns the number of jobs added or re-queued.
+        """
+        candidates: list[tuple[str, os.stat_result]] = []
+        with self._lock:
+            for path in paths:
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if time.time() - stat.st_mtime < settle_seconds:
+                    continue
+                key = self._key(path)
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, status FROM jobs WHERE key = ?", (key,)
+                ).fetchone()
+                changed = row is not None and (
+                    row[2] == MISSING or row[:2] != (stat.st_size, stat.st_mtime_ns)
+                )
+                if row is None or (changed and row[2] not in (QUEUED, LEASED)):
+                    candidates.append((key, stat))
+
+        # Probing runs a subprocess per file, so it is kept out of the lock.
+        rows = []
+        for key, stat in candidates:
+            try:
+                seconds = duration(self.root / key)
+            except (OSError, RuntimeError):
+                seconds = 0.0
+            rows.append((key, stat.st_size, stat.st_mtime_ns, seconds))
+
+        added = 0
+        now = time.time()
+        with self._transaction() as conn:
+            for key, size, mtime_ns, seconds in rows:
+                cursor = conn.execute(
+                    "INSERT INTO jobs (key, size, mtime_ns, duration, status,"
+                    " updated_at) VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (key) DO UPDATE SET size = excluded.size,"
+                    " mtime_ns = excluded.mtime_ns, duration = excluded.duration,"
+                    " status = excluded.status, attempts = 0, available_at = 0,"
+                    " error = NULL, updated_at = excluded.updated_at"
+                    " WHERE jobs.status NOT IN (?, ?)",
+                    (key, size, mtime_ns, seconds, QUEUED, now, QUEUED, LEASED),
+                )
+                added += cursor.rowcount
+        if added:
+            metrics.incr("queue_enqueued", added)
+        return added
+
+    def claim(self) -> Lease | None:
+        """Lease the next job, or return None if nothing is available."""
+        now = time.time()
+        order = "DESC" if self.longest_first else "ASC"
+        with self._transaction() as conn:
+            expired = self._expire(conn, now)
+            rows = conn.execute(
+                "SELECT key FROM jobs WHERE status = ? AND available_at <= ?"
+                f" ORDER BY duration {order}, key",
+                (QUEUED, now),
+            ).fetchall()
+            for (key,) in rows:
+                path = self.root / key
+                if not path.exists():
+                    self._set(conn, key, MISSING, now)
+                    continue
+                token = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, token = ?,"
+                    " lease_expires = ?, attempts = attempts + 1, updated_at = ?"
+                    " WHERE key = ?",
+                    (
+                        LEASED,
+                        self.worker_id,
+                        token,
+                        now + self.lease_seconds,
+                        now,
+                        key,
+                    ),
+                )
+                lease = Lease(key, path, token)
+                break
+            else:
+                lease = None
+        if expired:
+            metrics.incr("queue_leases_expired", expired)
+        if lease is not None:
+            metrics.incr("queue_claims")
+        return lease
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """Extend *lease*; False if it expired and was taken by another worker."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ?"
+                " WHERE key = ? AND token = ? AND status = ?",
+                (now + self.lease_seconds, now, lease.key, lease.token, LEASED),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, lease: Lease, archive: Callable[[], object]) -> None:
+        """Run *archive* and mark the job done, if *lease* is still held.
+
+        *archive* runs inside the transaction, so no other worker can claim
+        the job in between and a recording is archived exactly once.
+        Raises ``RuntimeError`` if the lease was lost.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            self._check(conn, lease)
+            archive()
+            self._set(conn, lease.key, DONE, now)
+
+    def fail(self, lease: Lease, error: str) -> None:
+        """Queue the job again after *retry_seconds*, or give up on it."""
+        now = time.time()
+        with self._transaction() as conn:
+            try:
+                self._check(conn, lease)
+            except RuntimeError:
+                return
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+                " owner = NULL, token = NULL, lease_expires = NULL,"
+                " available_at = ?, error = ?, updated_at = ? WHERE key = ?",
+                (
+                    self.max_attempts,
+                    FAILED,
+                    QUEUED,
+                    now + self.retry_seconds,
+                    error,
+                    now,
+                    lease.key,
+                ),
+            )
+
+    def release(self, lease: Lease) -> None:
+        """Give an unfinished job back without counting the attempt."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, token = NULL,"
+                " lease_expires = NULL, attempts = MAX(attempts - 1, 0),"
+                " updated_at = ? WHERE key = ? AND token = ? AND status = ?",
+                (QUEUED, time.time(), lease.key, lease.token, LEASED),
+            )
+
+    def counts(self) -> dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------------------  helpers  ----------------------------------
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold SQLite's write lock (across hosts) for the block."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _expire(self, conn: sqlite3.Connection, now: float) -> int:
+        """Queue the jobs of expired leases again; returns their number."""
+        cursor = conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+            " owner = NULL, token = NULL, lease_expires = NULL,"
+            " error = 'lease expired', updated_at = ?"
+            " WHERE status = ? AND lease_expires < ?",
+            (self.max_attempts, FAILED, QUEUED, now, LEASED, now),
+        )
+        return cursor.rowcount
+
+    def _check(self, conn: sqlite3.Connection, lease: Lease) -> None:
+        row = conn.execute(
+            "SELECT status, token FROM jobs WHERE key = ?", (lease.key,)
+        ).fetchone()
+        if row != (LEASED, lease.token):
+            raise RuntimeError(
+                f"The lease on {lease.key} was lost; another worker took it over."
+            )
+
+    def _set(self, conn: sqlite3.Connection, key: str, status: str, now: float) -> None:
+        conn.execute(
+            "UPDATE jobs SET status = ?, owner = NULL, token = NULL,"
+            " lease_expires = NULL, error = NULL, updated_at = ? WHERE key = ?",
+            (status, now, key),
+        )
+
+    def _key(self, path: Path) -> str:
+        return Path(path).relative_to(self.root).as_posix()
@@ -0,0 +1,185 @@
+import threading
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import config
+
+from .discovery import DONE, DiscoveryIndex
+from .metrics import metrics
+from .pipeline import Stage
+from .processor import RecordingJob, RecordingProcessor
+from .work_queue import Lease, WorkQueue
+
+
+@dataclass
+class QueueWorker:
+    """One of any number of processes draining a shared `WorkQueue`.
+
+    Like `RecordingDaemon`, the transcriber is loaded once and the shared
+    recordings folder is scanned every *poll_seconds*; settled files are
+    added to the queue, which hands each recording to a single worker.
+    A recording is only claimed when a transcription slot is free, so idle
+    hosts are not left waiting on jobs queued here. The leases held are
+    renewed well before they expire. A job whose lease was lost stops
+    before it writes to Notion and is never archived, and failures are
+    given back to the queue for a later retry by any worker.
+
+    `stop` lets the chunks in flight finish, then returns from `run`;
+    recordings not finished by then are released to the other workers.
+    """
+
+    processor: RecordingProcessor
+    queue: WorkQueue
+    index: DiscoveryIndex
+    poll_seconds: float = config.WATCH_POLL_SECONDS
+    settle_seconds: float = config.WATCH_SETTLE_SECONDS
+
+    _leases: dict[Path, Lease] = field(default_factory=dict, init=False, repr=False)
+    # Jobs still running whose lease another worker has taken over.
+    _lost: set[Path] = field(default_factory=set, init=False, repr=False)
+    _slots: threading.Semaphore = field(
+        default_factory=lambda: threading.Semaphore(config.TRANSCRIBE_WORKERS),
+        init=False,
+        repr=False,
+    )
+    _stopping: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+    _counts: dict[str, int] = field(
+        default_factory=lambda: {"processed": 0, "failed": 0},
+        init=False,
+        repr=False,
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    # ------------------------------------------------------------------
+    #  Public API
+    # ------------------------------------------------------------------
+    def run(self) -> dict[str, int]:
+        """Process queued recordings until `stop` is called; returns counts."""
+        load = getattr(self.processor.model, "load", None)
+        if load is not None:
+            load()
+
+        pipeline = self.processor.build_pipeline(
+            on_error=self._on_error, archive_with=self._archive
+        )
+        for stage in pipeline.stages:
+            if stage.name == "transcribe":
+                stage.handler = self._in_slot(stage.handler)
+            elif stage.name in ("publish", "overview"):
+                stage.handler = self._while_leased(stage.handler)
+        worker = threading.Thread(
+            target=pipeline.run, args=(self._jobs(),), name="worker-pipeline"
+        )
+        worker.start()
+        # Leases are renewed three times per lease period.
+        interval = min(self.poll_seconds, self.queue.lease_seconds / 3)
+        try:
+            while not self._stopping.is_set():
+                self._heartbeat()
+                self.queue.enqueue(self.index.scan(), self.settle_seconds)
+                self._stopping.wait(interval)
+        finally:
+            self._stopping.set()
+            self.processor.stop.set()
+            # Keep the leases of the jobs in flight alive while they drain.
+            while worker.is_alive():
+                self._heartbeat()
+                worker.join(interval)
+            with self._lock:
+                leases, self._leases = list(self._leases.values()), {}
+                self._lost.clear()
+            for lease in leases:
+                self.queue.release(lease)
+        return dict(self._counts)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    # ---------------------  helpers  ----------------------------------
+    def _jobs(self) -> Iterator[RecordingJob]:
+        while not self._stopping.is_set():
+            # The slot is given back by `_in_slot` once transcription is over.
+            if not self._slots.acquire(timeout=self.poll_seconds):
+                continue
+            lease = self.queue.claim()
+            if lease is None:
+                self._slots.release()
+                self._stopping.wait(self.poll_seconds)
+                continue
+            with self._lock:
+                self._leases[lease.path] = lease
+            yield RecordingJob(lease.path)
+
+    def _heartbeat(self) -> None:
+        with self._lock:
+            leases = list(self._leases.values())
+        for lease in leases:
+            if self.queue.heartbeat(lease):
+                continue
+            with self._lock:
+                # Archived since the list was taken, so not lost after all.
+                if self._leases.get(lease.path) is not lease:
+                    continue
+                del self._leases[lease.path]
+                self._lost.add(lease.path)
+            metrics.event("queue_lease_lost", recording=lease.key)
+            print(f"{lease.key}: lease lost to another worker")
+
+    def _in_slot(
+        self, handler: Callable[[RecordingJob], RecordingJob | None]
+    ) -> Callable[[RecordingJob], RecordingJob | None]:
+        def transcribe(job: RecordingJob) -> RecordingJob | None:
+            try:
+                return handler(job)
+            finally:
+                self._slots.release()
+
+        return transcribe
+
+    def _while_leased(
+        self, handler: Callable[[RecordingJob], RecordingJob]
+    ) -> Callable[[RecordingJob], RecordingJob]:
+        def step(job: RecordingJob) -> RecordingJob:
+            self._check_lease(job)
+            return handler(job)
+
+        return step
+
+    def _check_lease(self, job: RecordingJob) -> Lease:
+        """Return the job's lease; raises ``RuntimeError`` if it was lost."""
+        with self._lock:
+            lease = self._leases.get(job.path)
+            lost = job.path in self._lost
+        if lost or lease is None:
+            raise RuntimeError(f"{job.path}: lease lost, left to its new holder.")
+        return lease
+
+    def _archive(self, job: RecordingJob) -> RecordingJob:
+        lease = self._check_lease(job)
+
+        def archive() -> None:
+            self.processor.archive(job)
+            # Still inside the queue's transaction, so no heartbeat runs
+            # between the job being done and its lease being dropped.
+            with self._lock:
+                del self._leases[job.path]
+                self._counts["processed"] += 1
+
+        self.queue.complete(lease, archive)
+        self.index.mark(job.path, DONE, job.state.audio_hash)
+        return job
+
+    def _on_error(self, job: RecordingJob, stage: Stage, exc: Exception) -> None:
+        with self._lock:
+            lease = self._leases.pop(job.path, None)
+            self._lost.discard(job.path)
+            self._counts["failed"] += 1
+        if lease is not None:
+            self.queue.fail(lease, f"{stage.name} failed: {exc}")
+        metrics.event("worker_error", recording=job.path.name, stage=stage.name)
+        print(f"{job.path}: {stage.name} failed: {exc}")
@@ -10,19 +10,149 @@ load_dotenv()
 # ---------------------------------------------------------------------------
 LANGUAGE: str = os.getenv("LANGUAGE", "ENG").upper()  # ENG | ITA
 OWNER: str | None = os.getenv("OWNER")
+# Per-folder language and owner, e.g. "Analisi 1=luca_it;Physics=anna_en".
+# Used for recordings whose folders are not named <owner>_<lang> and that
+# have no sidecar file; LANGUAGE and OWNER remain the defaults.
+FOLDER_META: dict[str, str] = dict(
+    entry.split("=", 1)
+    for entry in os.getenv("FOLDER_META", "").split(";")
+    if "=" in entry
+)
 
 # Notion integration
 NOTION_DB_ID: str | None = os.getenv("NOTION_DB_ID")
 NOTION_API_KEY: str | None = os.getenv("NOTION_API_KEY")
+NOTION_BASE_URL: str = os.getenv("NOTION_BASE_URL", "https://api.notion.com/v1")
+NOTION_RPS: float = float(os.getenv("NOTION_RPS", "3"))
+NOTION_MAX_RETRIES: int = int(os.getenv("NOTION_MAX_RETRIES", "5"))
+# Transcript characters per paragraph block, stored as runs of up to 2000
+NOTION_PARAGRAPH_CHARS: int = int(os.getenv("NOTION_PARAGRAPH_CHARS", "4000"))
 
 # OpenAI
 OPENAI_API_KEY: str | None = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o")
+# Point the clients at another endpoint, e.g. the local benchmark stand-ins
+OPENAI_BASE_URL: str | None = os.getenv("OPENAI_BASE_URL") or None
 TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.1"))
+OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))
+# Per-minute budgets shared by all concurrent requests (0 = unlimited)
+OPENAI_RPM: int = int(os.getenv("OPENAI_RPM", "0"))
+OPENAI_TPM: int = int(os.getenv("OPENAI_TPM", "0"))
+# Attempts after an invalid reply or a transient API error, with jittered
+# exponential backoff starting at LLM_RETRY_BACKOFF seconds
+LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BACKOFF: float = float(os.getenv("LLM_RETRY_BACKOFF", "1.0"))
+# Expected size of one structured reply, reserved in the chunk budget and
+# counted by the rate limiter
+OUTPUT_TOKENS: int = int(os.getenv("OUTPUT_TOKENS", "2048"))
+# Upper bound on transcript tokens per chunk (0 = fill the context window)
+CHUNK_MAX_TOKENS: int = int(os.getenv("CHUNK_MAX_TOKENS", "6000"))
+
+# Batch mode (main.py --batch): submitted batches are recorded here so an
+# interrupted run resumes them; results are polled every BATCH_POLL_SECONDS
+BATCH_PATH: Path = Path(os.getenv("BATCH_PATH", ".state/batches"))
+BATCH_POLL_SECONDS: float = float(os.getenv("BATCH_POLL_SECONDS", "60"))
+BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", "50000"))
+
+# Lecture overview reduced from the chunk summaries and published at the top
+# of the page (1 = on); at most OVERVIEW_FAN_IN parts are merged per request
+LECTURE_OVERVIEW: bool = os.getenv("LECTURE_OVERVIEW", "0") == "1"
+OVERVIEW_FAN_IN: int = int(os.getenv("OVERVIEW_FAN_IN", "8"))
 
 # Paths
 PROMPTS_PATH: Path = Path("prompts")
 
+# Transcription engine: "whisper" (openai-whisper, PyTorch) or
+# "faster-whisper" (CTranslate2, int8 on CPU by default)
+TRANSCRIBE_ENGINE: str = os.getenv("TRANSCRIBE_ENGINE", "whisper")
+# Whisper model size (tiny | base | small | medium | large), for either engine
+WHISPER_MODEL: str = os.getenv("WHISPER_MODEL", "medium")
+# CPU threads (0 = the engine's default) and beam size (1 = greedy decoding)
+TRANSCRIBE_THREADS: int = int(os.getenv("TRANSCRIBE_THREADS", "0"))
+TRANSCRIBE_BEAM_SIZE: int = int(os.getenv("TRANSCRIBE_BEAM_SIZE", "1"))
+# faster-whisper only: device (cpu | cuda | auto) and CTranslate2 compute type
+TRANSCRIBE_DEVICE: str = os.getenv("TRANSCRIBE_DEVICE", "cpu")
+TRANSCRIBE_COMPUTE_TYPE: str = os.getenv("TRANSCRIBE_COMPUTE_TYPE", "int8")
+
+# Worker threads per pipeline stage (Whisper runs on one model instance)
+TRANSCRIBE_WORKERS: int = int(os.getenv("TRANSCRIBE_WORKERS", "1"))
+ENRICH_WORKERS: int = int(os.getenv("ENRICH_WORKERS", "2"))
+PUBLISH_WORKERS: int = int(os.getenv("PUBLISH_WORKERS", "1"))
+
+# Streaming transcription: chunks are enriched and published while Whisper
+# is still working through the file, one bounded audio window at a time
+STREAMING_TRANSCRIPTION: bool = os.getenv("STREAMING_TRANSCRIPTION", "0") == "1"
+STREAM_WINDOW_SECONDS: float = float(os.getenv("STREAM_WINDOW_SECONDS", "300"))
+
+# Cut silences of at least TRIM_SILENCE_SECONDS out of the audio before
+# transcribing, keeping TRIM_SILENCE_PADDING seconds at each edge (0 = off)
+TRIM_SILENCE_SECONDS: float = float(os.getenv("TRIM_SILENCE_SECONDS", "0"))
+TRIM_SILENCE_PADDING: float = float(os.getenv("TRIM_SILENCE_PADDING", "0.25"))
+
+# Transcribe each recording with this many Whisper processes, each working
+# on a silence-bounded slice (0 = a single in-process model)
+PARALLEL_TRANSCRIBE_WORKERS: int = int(os.getenv("PARALLEL_TRANSCRIBE_WORKERS", "0"))
+
+# Back decoded audio with temporary files here instead of RAM (empty = RAM)
+AUDIO_MMAP_DIR: Path | None = (
+    Path(os.environ["AUDIO_MMAP_DIR"]) if os.getenv("AUDIO_MMAP_DIR") else None
+)
+
+# Per-recording resume state (transcript, chunks, Notion progress)
+CHECKPOINTS_PATH: Path = Path(os.getenv("CHECKPOINTS_PATH", ".state/recordings"))
+# Published pages: page id and a content hash per section, so publishing a
+# recording again only rewrites the sections that changed (empty = append)
+NOTION_MANIFEST_PATH: Path | None = (
+    Path(os.getenv("NOTION_MANIFEST_PATH", ".state/notion_pages"))
+    if os.getenv("NOTION_MANIFEST_PATH", ".state/notion_pages")
+    else None
+)
+# Index of the recordings seen so far, so each run only looks at changes
+DISCOVERY_INDEX_PATH: Path = Path(
+    os.getenv("DISCOVERY_INDEX_PATH", ".state/discovery.sqlite")
+)
+
+# Watch mode (main.py --watch): poll interval, how long a file's size and
+# mtime must stay unchanged before it is picked up, retry delay after a
+# failure, and where the daemon's status JSON is written (empty = none)
+WATCH_POLL_SECONDS: float = float(os.getenv("WATCH_POLL_SECONDS", "10"))
+WATCH_SETTLE_SECONDS: float = float(os.getenv("WATCH_SETTLE_SECONDS", "30"))
+WATCH_RETRY_SECONDS: float = float(os.getenv("WATCH_RETRY_SECONDS", "600"))
+WATCH_STATUS_PATH: Path | None = (
+    Path(os.getenv("WATCH_STATUS_PATH", ".state/daemon.json"))
+    if os.getenv("WATCH_STATUS_PATH", ".state/daemon.json")
+    else None
+)
+
+# Worker mode (main.py --worker): the shared job queue (on the recordings
+# volume, so every host sees it), how long a claimed recording stays leased
+# without a heartbeat, claims per recording before it is given up, delay
+# before a failed one is retried, and whether longer recordings go first
+WORK_QUEUE_PATH: Path = Path(
+    os.getenv("WORK_QUEUE_PATH", "recordings/.queue.sqlite")
+)
+QUEUE_LEASE_SECONDS: float = float(os.getenv("QUEUE_LEASE_SECONDS", "300"))
+QUEUE_MAX_ATTEMPTS: int = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_RETRY_SECONDS: float = float(os.getenv("QUEUE_RETRY_SECONDS", "600"))
+QUEUE_LONGEST_FIRST: bool = os.getenv("QUEUE_LONGEST_FIRST", "1") == "1"
+
+# Instrumentation: JSON-lines events are appended under METRICS_DIR; set
+# METRICS_PROMETHEUS_PATH to also write a Prometheus text-format file
+METRICS_DIR: Path = Path(os.getenv("METRICS_DIR", "metrics"))
+METRICS_PROMETHEUS_PATH: Path | None = (
+    Path(os.environ["METRICS_PROMETHEUS_PATH"])
+    if os.getenv("METRICS_PROMETHEUS_PATH")
+    else None
+)
+
+# On-disk cache of LLM chunk responses (0 disables the size/age limit)
+LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_PATH: Path = Path(
+    os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite")
+)
+LLM_CACHE_MAX_MB: int = int(os.getenv("LLM_CACHE_MAX_MB", "512"))
+LLM_CACHE_MAX_AGE_DAYS: float = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "90"))
+
 # ---------------------------------------------------------------------------
 #  Validation helpers
 # ---------------------------------------------------------------------------
@@ -31,12 +161,9 @@ def validate() -> None:
     """Validate mandatory configuration values and raise if they're missing."""
     if LANGUAGE not in {"ENG", "ITA"}:
         raise EnvironmentError("LANGUAGE must be ENG or ITA")
+    if TRANSCRIBE_ENGINE not in {"whisper", "faster-whisper"}:
+        raise EnvironmentError("TRANSCRIBE_ENGINE must be whisper or faster-whisper")
     if OPENAI_API_KEY is None:
         raise EnvironmentError("OPENAI_API_KEY is missing")
     if NOTION_DB_ID is None or NOTION_API_KEY is None:
         raise EnvironmentError("NOTION_DB_ID and NOTION_API_KEY must be set")
-
-
-def output_language() -> str:
-    """Return the full language string expected by LLM prompts."""
-    return "English" if LANGUAGE == "ENG" else "Italian"
@@ -1,18 +1,30 @@
+import argparse
 import os
+import signal
 from pathlib import Path
 
-import whisper
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+import config
+from classes.batch import BatchEnricher
 from classes.chatGPT import ChatGPTUtils
-from classes.notion import NotionPage
-from classes.utils import (
-    get_chunks_from_transcription,
-    get_paths,
-    get_recording,
-    move_to_folder,
+from classes.checkpoint import CheckpointStore
+from classes.daemon import RecordingDaemon
+from classes.discovery import DONE, FAILED, DiscoveryIndex
+from classes.metrics import metrics
+from classes.notion_manifest import ManifestStore
+from classes.pipeline import Stage
+from classes.processor import RecordingJob, RecordingProcessor
+from classes.transcription import (
+    ParallelTranscriber,
+    SilenceTrimmer,
+    TranscriptionEngine,
+    create_engine,
 )
+from classes.utils import order_by_language, resolve_recording_meta
+from classes.work_queue import WorkQueue
+from classes.worker import QueueWorker
 
 
 def _validate_env() -> tuple[str, str]:
@@ -29,37 +41,236 @@ def _validate_env() -> tuple[str, str]:
     return language, model
 
 
-def main() -> None:
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Transcribe, summarize and publish lecture recordings."
+    )
+    parser.add_argument(
+        "--plan",
+        "--dry-run",
+        dest="plan",
+        action="store_true",
+        help="List the recordings that would be processed and exit.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running, processing new recordings as they appear.",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Keep running as one of several workers sharing a job queue.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Enrich all pending chunks through the OpenAI Batch API first.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile every pipeline thread with cProfile and print the hot paths.",
+    )
+    return parser.parse_args(argv)
+
+
+def _print_plan(paths: list[Path]) -> None:
+    total_mb = 0.0
+    for path in paths:
+        size_mb = path.stat().st_size / 1e6
+        total_mb += size_mb
+        try:
+            language = resolve_recording_meta(path)[0].full_name
+        except (OSError, ValueError) as exc:
+            language = f"invalid metadata: {exc}"
+        print(f"{path}  ({size_mb:.1f} MB, {language})")
+    print(f"{len(paths)} recording(s) to process, {total_mb:.1f} MB in total")
+
+
+def _load_transcriber() -> TranscriptionEngine:
+    """Return the configured engine (or process pool); nothing is loaded yet."""
+    if config.PARALLEL_TRANSCRIBE_WORKERS > 1:
+        if config.STREAMING_TRANSCRIPTION:
+            raise EnvironmentError(
+                "PARALLEL_TRANSCRIBE_WORKERS cannot be combined with "
+                "STREAMING_TRANSCRIPTION."
+            )
+        engine = ParallelTranscriber(
+            config.WHISPER_MODEL,
+            config.PARALLEL_TRANSCRIBE_WORKERS,
+            engine=config.TRANSCRIBE_ENGINE,
+        )
+    else:
+        engine = create_engine()
+    if config.TRIM_SILENCE_SECONDS > 0:
+        return SilenceTrimmer(engine)
+    return engine
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
     # Load .env if present
     load_dotenv()
 
-    _, model = _validate_env()
-
     recordings_root = Path("recordings")
     if not recordings_root.exists():
         raise FileNotFoundError(
             "'recordings' folder not found. Create it and add your audio subfolders."
         )
 
-    paths = get_paths(recordings_root)
-    gpt_utils = ChatGPTUtils(model=model)
-    model = whisper.load_model("medium")
-
-    for path in tqdm(paths, desc="Processing recordings"):
-        recording = get_recording(path)
-        transcription = model.transcribe(str(recording.audio_path))["text"]
-        chunks = get_chunks_from_transcription(
-            str(transcription), max_tokens=2000
-        )  # Also take into account the input prompt and the output
-        notion_page = NotionPage(recording)
-
-        for idx, chunk in tqdm(enumerate(chunks), desc="Processing chunks"):
-            chunk_obj = gpt_utils.get_additional_info(
-                chunk_str=chunk, language=recording.language
-            )
-            notion_page.update_page(chunk_obj, idx + 1)
+    index = DiscoveryIndex(config.DISCOVERY_INDEX_PATH, recordings_root)
+    # Recordings of one language are processed one after the other.
+    paths = order_by_language(index.scan())
+    keep_running = args.watch or args.worker
+    if args.plan or not (paths or keep_running):
+        index.close()
+    if args.plan:
+        _print_plan(paths)
+        return
+    if not (paths or keep_running):
+        print("No new recordings found.")
+        return
+
+    _, model = _validate_env()
+    if args.profile:
+        metrics.profile_dir = config.METRICS_DIR / "profiles"
+    metrics.open(config.METRICS_DIR / "metrics.jsonl")
+    processor: RecordingProcessor | None = None
+    try:
+        processor = _build_processor(model)
+        with metrics.profile_thread("main"):
+            if args.worker:
+                _work(processor, index=index)
+            elif args.watch:
+                _watch(processor, index=index)
+            elif args.batch:
+                _run_batch(paths, processor, index=index)
+            else:
+                _run(paths, processor, index=index)
+    finally:
+        # Shuts down the worker processes of a `ParallelTranscriber`.
+        close = getattr(processor and processor.model, "close", None)
+        if close is not None:
+            close()
+        index.close()
+        if config.METRICS_PROMETHEUS_PATH is not None:
+            metrics.write_prometheus(config.METRICS_PROMETHEUS_PATH)
+        metrics.close()
+        merged = metrics.merge_profiles()
+        if merged is not None:
+            print(f"Profile written to {merged}")
+
+
+def _build_processor(openai_model: str) -> RecordingProcessor:
+    return RecordingProcessor(
+        _load_transcriber(),
+        ChatGPTUtils(model=openai_model),
+        CheckpointStore(config.CHECKPOINTS_PATH),
+        manifests=(
+            ManifestStore(config.NOTION_MANIFEST_PATH)
+            if config.NOTION_MANIFEST_PATH is not None
+            else None
+        ),
+    )
+
+
+def _watch(processor: RecordingProcessor, index: DiscoveryIndex) -> None:
+    daemon = RecordingDaemon(processor, index)
+
+    def request_stop(signum, frame) -> None:
+        print("Stopping after the chunks in progress...")
+        daemon.stop()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    print(f"Watching {index.root} (Ctrl+C to stop)")
+    daemon.run()
 
-        move_to_folder(recording.audio_path, "processed")
+
+def _work(processor: RecordingProcessor, index: DiscoveryIndex) -> None:
+    queue = WorkQueue(config.WORK_QUEUE_PATH, index.root)
+    worker = QueueWorker(processor, queue, index)
+
+    def request_stop(signum, frame) -> None:
+        print("Stopping after the chunks in progress...")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    print(f"Worker {queue.worker_id} on {queue.path} (Ctrl+C to stop)")
+    try:
+        counts = worker.run()
+    finally:
+        queue.close()
+    print(f"{counts['processed']} recording(s) processed, {counts['failed']} failed")
+
+
+def _run_batch(
+    paths: list[Path], processor: RecordingProcessor, index: DiscoveryIndex
+) -> None:
+    """Transcribe and chunk everything, enrich it in one batch, then publish."""
+    if config.STREAMING_TRANSCRIPTION:
+        raise EnvironmentError(
+            "--batch cannot be combined with STREAMING_TRANSCRIPTION."
+        )
+
+    def on_error(job: RecordingJob, stage: Stage, exc: Exception) -> None:
+        index.mark(job.path, FAILED)
+        tqdm.write(f"{job.path}: {stage.name} failed: {exc}")
+
+    pipeline = processor.build_pipeline(
+        on_error=on_error, steps=("transcribe", "chunk")
+    )
+    states = []
+    for job in pipeline.run(RecordingJob(path) for path in tqdm(paths)):
+        if job.stream is not None:
+            # An interrupted stream is finished by the regular run.
+            job.stream.close()
+            continue
+        states.append((job.state, job.recording.language))
+
+    counts = BatchEnricher(processor.gpt_utils, processor.store).run(states)
+    print(
+        f"Batch: {counts['enriched']} chunks enriched, {counts['cached']} cached, "
+        f"{counts['failed']} left for the regular requests"
+    )
+    # Publishing and any chunks the batch could not enrich.
+    _run(paths, processor, index=index)
+
+
+def _run(
+    paths: list[Path], processor: RecordingProcessor, index: DiscoveryIndex
+) -> None:
+    gpt_utils = processor.gpt_utils
+
+    # Stages overlap across recordings: Whisper runs on the next file while
+    # the previous one is being enriched and published.
+    failures: list[tuple[Path, str, Exception]] = []
+    with tqdm(total=len(paths), desc="Processing recordings") as progress:
+
+        def on_error(job: RecordingJob, stage: Stage, exc: Exception) -> None:
+            failures.append((job.path, stage.name, exc))
+            index.mark(job.path, FAILED)
+            tqdm.write(f"{job.path}: {stage.name} failed: {exc}")
+            progress.update()
+
+        def on_archived(job: RecordingJob) -> None:
+            index.mark(job.path, DONE, job.state.audio_hash)
+            progress.update()
+
+        pipeline = processor.build_pipeline(
+            on_error=on_error, on_archived=on_archived
+        )
+        pipeline.run(RecordingJob(path) for path in paths)
+
+    if gpt_utils.cache is not None:
+        metrics.event("llm_cache", **gpt_utils.cache.stats())
+    if failures:
+        raise RuntimeError(
+            f"{len(failures)} of {len(paths)} recordings failed; "
+            "rerun to resume them from their checkpoints."
+        )
 
 
 if __name__ == "__main__":
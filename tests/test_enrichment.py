@@ -0,0 +1,40 @@
+import time
+
+from classes.chatGPT import ChatGPTUtils
+from classes.chunk import Chunk
+from classes.recordings import Language
+
+
+class _FakeGPT(ChatGPTUtils):
+    def get_additional_info(self, chunk_str: str, language: Language) -> Chunk:
+        time.sleep(0.05)
+        return Chunk(
+            title=chunk_str,
+            transcript=chunk_str,
+            summary="",
+            main_points=[],
+            follow_up=[],
+        )
+
+
+def test_result_is_yielded_before_the_next_input_arrives():
+    events: list[str] = []
+
+    def slow_inputs():
+        for text in ("one", "two"):
+            events.append(f"input {text}")
+            yield text
+            time.sleep(0.5)
+
+    gpt = _FakeGPT("gpt-4o", cache=None)
+    for chunk in gpt.get_additional_info_many(slow_inputs(), Language.ENGLISH, 4):
+        events.append(f"result {chunk.title}")
+
+    assert events == ["input one", "result one", "input two", "result two"]
+
+
+def test_results_keep_input_order():
+    gpt = _FakeGPT("gpt-4o", cache=None)
+    texts = [str(n) for n in range(20)]
+    results = gpt.get_additional_info_many(iter(texts), Language.ENGLISH, 4)
+    assert [chunk.title for chunk in results] == texts
@@ -0,0 +1,36 @@
+import pytest
+
+import classes.chatGPT as chatgpt
+from classes.chatGPT import ChatGPTUtils
+from classes.chunk import Chunk
+
+
+def _chunks(count: int) -> list[Chunk]:
+    return [
+        Chunk(title=str(n), transcript="", summary="", main_points=[], follow_up=[])
+        for n in range(count)
+    ]
+
+
+@pytest.fixture
+def gpt(monkeypatch):
+    # Every section counts as 10 tokens.
+    monkeypatch.setattr(chatgpt, "count_tokens_batch", lambda texts: [10] * len(texts))
+    return ChatGPTUtils("gpt-4o", cache=None)
+
+
+def test_lone_last_part_joins_a_group_with_room(gpt):
+    groups = gpt._group_for_overview(_chunks(5), fan_in=3, budget=1000)
+    assert [len(group) for group in groups] == [3, 2]
+
+
+def test_lone_last_part_never_overfills_the_fan_in(gpt):
+    groups = gpt._group_for_overview(_chunks(7), fan_in=3, budget=1000)
+    assert [len(group) for group in groups] == [3, 2, 2]
+    assert [c.title for group in groups for c in group] == [str(n) for n in range(7)]
+
+
+def test_lone_last_part_never_overfills_the_budget(gpt):
+    groups = gpt._group_for_overview(_chunks(4), fan_in=8, budget=30)
+    assert [len(group) for group in groups] == [2, 2]
+    assert all(10 * len(group) <= 30 for group in groups)
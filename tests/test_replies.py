@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+import config
+from classes.cache import ResponseCache
+from classes.chatGPT import ChatGPTUtils
+
+COMPLETE = {"title": "T", "summary": "S", "main_points": ["a"], "follow_up": []}
+
+
+class _ScriptedGPT(ChatGPTUtils):
+    """Answers every request with the next of *replies*."""
+
+    def __init__(self, replies: list[str], cache: ResponseCache):
+        super().__init__("gpt-4o", cache=cache)
+        self.replies = list(replies)
+
+    def _create_response(self, request: dict) -> str:
+        return self.replies.pop(0)
+
+
+def test_repaired_reply_missing_a_key_is_rejected():
+    gpt = ChatGPTUtils("gpt-4o", cache=None)
+    truncated = '{"title": "T", "summary": "S", "main_points": ["a", "b'
+    with pytest.raises(ValueError, match="follow_up"):
+        gpt._parse_reply(truncated, fix_up=False)
+
+
+def test_reply_with_empty_title_is_rejected():
+    gpt = ChatGPTUtils("gpt-4o", cache=None)
+    with pytest.raises(ValueError, match="title"):
+        gpt._parse_reply(json.dumps({**COMPLETE, "title": ""}), fix_up=False)
+
+
+def test_partial_reply_is_retried_and_never_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LLM_RETRY_BACKOFF", 0)
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    partial = json.dumps({"title": "T", "main_points": []})
+    gpt = _ScriptedGPT([partial, json.dumps(COMPLETE)], cache)
+
+    assert gpt._get_structured_response("sys", "user") == COMPLETE
+    assert cache.get(gpt._cache_key("sys", "user")) == COMPLETE
@@ -0,0 +1,47 @@
+import pytest
+
+import classes.utils as utils
+from classes.checkpoint import CheckpointStore
+from classes.processor import RecordingJob, RecordingProcessor
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch):
+    path = tmp_path / "en" / "lecture.m4a"
+    path.parent.mkdir()
+    path.write_bytes(b"not really audio")
+    probes = []
+
+    def probe_duration(file_path):
+        probes.append(file_path)
+        return 1800.0
+
+    monkeypatch.setattr(utils, "probe_duration", probe_duration)
+    return path, probes
+
+
+def test_transcribed_recording_is_not_probed_again(tmp_path, recording):
+    path, probes = recording
+    store = CheckpointStore(tmp_path / "checkpoints")
+    state = store.load(utils.hash_file(path))
+    state.duration, state.transcript = 1800, "Hello."
+    store.save(state)
+
+    processor = RecordingProcessor(model=None, gpt_utils=None, store=store)
+    job = processor.transcribe(RecordingJob(path))
+    assert probes == []
+    assert job.recording.duration == 1800
+    assert job.state.transcript == "Hello."
+
+
+def test_checkpoint_without_duration_is_probed(tmp_path, recording):
+    path, probes = recording
+    store = CheckpointStore(tmp_path / "checkpoints")
+    state = store.load(utils.hash_file(path))
+    state.transcript = "Hello."
+    store.save(state)
+
+    processor = RecordingProcessor(model=None, gpt_utils=None, store=store)
+    job = processor.transcribe(RecordingJob(path))
+    assert probes == [path]
+    assert job.state.duration == 1800
@@ -0,0 +1,33 @@
+import numpy as np
+
+from classes.audio import SAMPLE_RATE, trim_silence
+
+
+def _tone(seconds: float, dbfs: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    # A sine's RMS is 3 dB below its peak.
+    amplitude = 10 ** ((dbfs + 3) / 20)
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def test_all_silence_is_trimmed():
+    audio = np.zeros(10 * SAMPLE_RATE, np.float32)
+    trimmed, offsets = trim_silence(audio, min_skip_seconds=1, padding_seconds=0.25)
+    assert len(trimmed) <= SAMPLE_RATE // 2
+    assert offsets.original_samples == len(audio)
+
+
+def test_faint_hiss_counts_as_silence():
+    audio = _tone(10, dbfs=-70)
+    trimmed, _ = trim_silence(audio, min_skip_seconds=1, padding_seconds=0.25)
+    assert len(trimmed) <= SAMPLE_RATE // 2
+
+
+def test_silence_between_speech_is_cut():
+    audio = np.concatenate([_tone(2, -20), np.zeros(5 * SAMPLE_RATE), _tone(2, -20)])
+    trimmed, offsets = trim_silence(audio, min_skip_seconds=1, padding_seconds=0.25)
+    assert len(trimmed) == int(4.5 * SAMPLE_RATE)
+    kept = [(0, 2.25), (6.75, 9)]
+    assert offsets.spans == [
+        (int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)) for start, end in kept
+    ]